@@ -0,0 +1,217 @@
+"""
+性能基准测试,生成模拟的通达信vipdoc目录并用本地模拟的akshare接口替代网络请求
+
+用法:
+    python benchmark.py --scales 500x250 2000x1250 5000x5000 --workers 1 8
+每个用例在单独的子进程中执行,以便统计各自的峰值内存
+"""
+import os
+import sys
+import json
+import time
+import types
+import shutil
+import argparse
+import datetime
+import subprocess
+import numpy as np
+import pandas as pd
+from tdx_reader import DAY_DTYPE, EXT_DAY_DTYPE, lday_folder, date2int
+
+CASES = ["shsz_amount", "get_top20_summary", "get_concept_summary", "get_index_summary", "main"]
+SCAN_CASES = ["shsz_amount", "get_top20_summary", "main"]  # 需要扫描全部日线文件的用例
+FETCH_RATE = 1e6  # 模拟接口每秒最多访问的次数,默认相当于不限速
+# 模拟股票的代码前缀及数量占比
+SYMBOL_PREFIXES = {
+    "sh": [("600", 0.2), ("601", 0.1), ("603", 0.1), ("688", 0.1)],
+    "sz": [("000", 0.1), ("002", 0.2), ("300", 0.2)],
+}
+
+
+def trade_dates(days, end: datetime.date = None):
+    """生成截至end的days个工作日作为模拟的交易日历"""
+    end = end or datetime.date.today() - datetime.timedelta(days=1)
+    return pd.bdate_range(end=end, periods=days).date.tolist()
+
+
+def day_records(dates, rng: np.random.Generator, dtype=DAY_DTYPE) -> np.ndarray:
+    """生成一只股票的日线记录"""
+    records = np.zeros(len(dates), dtype=dtype)
+    records["date"] = [date2int(d) for d in dates]
+    close = np.maximum(100 * np.cumprod(1 + rng.normal(0, 0.02, len(dates))), 1)
+    scale = 1 if dtype is EXT_DAY_DTYPE else 100
+    for field in ("open", "high", "low", "close"):
+        records[field] = close * scale
+    records["amount"] = rng.lognormal(18, 1.2, len(dates))
+    records["volume"] = np.minimum(records["amount"] / close, np.iinfo(np.uint32).max)
+    return records
+
+
+def generate_vipdoc(tdx_path, symbols=5000, days=1000, seed=0):
+    """在tdx_path下生成模拟的vipdoc/{sh,sz,ds}/lday目录,返回交易日历"""
+    rng = np.random.default_rng(seed)
+    dates = trade_dates(days)
+    for market in ("sh", "sz", "ds"):
+        os.makedirs(lday_folder(tdx_path, market), exist_ok=True)
+    for market, prefixes in SYMBOL_PREFIXES.items():
+        for prefix, ratio in prefixes:
+            for i in range(max(int(symbols * ratio), 1)):
+                # 模拟不同的上市时间
+                listed = dates[rng.integers(0, max(len(dates) // 2, 1)):]
+                code = f"{prefix}{i:03d}" if len(prefix) == 3 else f"{prefix}{i:04d}"
+                path = os.path.join(lday_folder(tdx_path, market), f"{market}{code}.day")
+                day_records(listed, rng).tofile(path)
+    for code in ("880823", "880878"):
+        day_records(dates, rng).tofile(os.path.join(lday_folder(tdx_path, "sh"), f"sh{code}.day"))
+    day_records(dates, rng, EXT_DAY_DTYPE).tofile(os.path.join(lday_folder(tdx_path, "ds"), "62#000300.day"))
+    return dates
+
+
+def fake_akshare(dates, latency=0.0) -> types.ModuleType:
+    """构造模拟的akshare模块,latency为每次接口调用的模拟延迟(秒)"""
+    module = types.ModuleType("akshare")
+
+    def tool_trade_date_hist_sina():
+        time.sleep(latency)
+        return pd.DataFrame({"trade_date": dates})
+
+    def stock_szse_summary(date):
+        time.sleep(latency)
+        categories = ["股票", "主板A股", "主板B股", "创业板A股", "基金", "ETF", "LOF", "封闭式基金",
+                      "分级基金", "债券", "债券回购", "期权", "资产支持证券", "优先股"]
+        amount = np.full(len(categories), 5e11)
+        return pd.DataFrame({"证券类别": categories, "数量": 1, "成交金额": amount, "总市值": amount, "流通市值": amount})
+
+    def stock_sse_deal_daily(date):
+        time.sleep(latency)
+        return pd.DataFrame({
+            "单日情况": ["挂牌数", "市价总值", "流通市值", "成交金额", "成交量"],
+            "股票": 1.0, "主板A": 5000.0, "主板B": 1.0, "科创板": 1000.0, "股票回购": 0.0,
+        })
+
+    module.tool_trade_date_hist_sina = tool_trade_date_hist_sina
+    module.stock_szse_summary = stock_szse_summary
+    module.stock_sse_deal_daily = stock_sse_deal_daily
+    return module
+
+
+def peak_rss() -> float:
+    """当前进程的峰值内存,单位MB"""
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+    except ImportError:
+        return _peak_working_set()
+
+
+def _peak_working_set() -> float:
+    """Windows下没有resource模块,通过GetProcessMemoryInfo读取峰值工作集,单位MB"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    try:
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.WinDLL("kernel32")
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi = ctypes.WinDLL("psapi")
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS),
+                                               wintypes.DWORD]
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return float("nan")
+        return counters.PeakWorkingSetSize / 1024 / 1024
+    except (AttributeError, OSError):
+        return float("nan")
+
+
+def run_case(case, root, workers, latency, fetch_rate=FETCH_RATE):
+    """在当前进程中执行单个用例,返回耗时及峰值内存"""
+    with open(os.path.join(root, "dates.json"), "r", encoding="utf-8") as f:
+        dates = [datetime.date.fromisoformat(d) for d in json.load(f)]
+    sys.modules["akshare"] = fake_akshare(dates, latency)
+    import data_api
+    data_path = os.path.join(root, f"data-{case}")
+    shutil.rmtree(data_path, ignore_errors=True)
+    os.makedirs(data_path)
+    data_api.data_path = data_path
+    data_api.tdx_path = os.path.join(root, "tdx")
+    data_api.scan_workers = workers
+    # 模拟接口没有限速的必要,否则main的耗时主要是令牌桶的等待
+    data_api.fetch_rate = fetch_rate
+    window = dates[-28:]
+    funcs = {
+        "shsz_amount": lambda: data_api.shsz_amount(window),
+        "get_top20_summary": lambda: data_api.get_top20_summary(window),
+        "get_concept_summary": lambda: data_api.get_concept_summary(window, "880823"),
+        "get_index_summary": lambda: data_api.get_index_summary(window, "62#000300"),
+        "main": data_api.main,
+    }
+    start = time.perf_counter()
+    funcs[case]()
+    elapsed = time.perf_counter() - start
+    return {"elapsed": elapsed, "peak_rss_mb": peak_rss()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data_api性能基准测试")
+    parser.add_argument("--scales", nargs="+", default=["500x250", "2000x1250", "5000x5000"],
+                        help="模拟规模,格式为<股票数>x<交易日数>")
+    parser.add_argument("--cases", nargs="+", default=CASES, choices=CASES)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1], help="扫描日线文件的进程数")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟接口的延迟(秒)")
+    parser.add_argument("--fetch-rate", type=float, default=FETCH_RATE,
+                        help="补齐缓存时每秒最多访问接口的次数,默认不限速,设为2.0时与data_api.fetch_rate一致")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_data"))
+    parser.add_argument("--output", help="将结果保存为json文件")
+    parser.add_argument("--child", nargs=3, metavar=("CASE", "ROOT", "WORKERS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        case, root, workers = args.child
+        print(json.dumps(run_case(case, root, int(workers), args.latency, args.fetch_rate)))
+        return
+    rd = []
+    for scale in args.scales:
+        symbols, days = [int(value) for value in scale.split("x")]
+        root = os.path.join(args.root, scale)
+        shutil.rmtree(root, ignore_errors=True)
+        print(f"生成模拟数据:{symbols}只股票,{days}个交易日")
+        dates = generate_vipdoc(os.path.join(root, "tdx"), symbols, days)
+        with open(os.path.join(root, "dates.json"), "w", encoding="utf-8") as f:
+            json.dump([d.isoformat() for d in dates], f)
+        files = sum(len(os.listdir(lday_folder(os.path.join(root, "tdx"), market))) for market in ("sh", "sz"))
+        for workers in args.workers:
+            for case in args.cases:
+                command = [sys.executable, os.path.abspath(__file__), "--latency", str(args.latency),
+                           "--fetch-rate", str(args.fetch_rate), "--child", case, root, str(workers)]
+                output = subprocess.run(command, cwd=root, stdout=subprocess.PIPE, text=True, check=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                result.update({"scale": scale, "case": case, "workers": workers, "fetch_rate": args.fetch_rate})
+                throughput = ""
+                if case in SCAN_CASES:
+                    result["files_per_sec"] = files / result["elapsed"]
+                    throughput = f" {result['files_per_sec']:.0f}文件/秒"
+                rd.append(result)
+                print(f"{scale:>12} {case:>20} workers={workers:<3} 耗时{result['elapsed']:.3f}秒"
+                      f"{throughput} 峰值内存{result['peak_rss_mb']:.1f}MB")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rd, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+命令行入口,各子命令只在执行时导入需要的模块,例如:
+
+    python cli.py report
+    python cli.py top20 --start 20251013
+    python cli.py summaries --data-path E:\\py-workspace\\stock\\data
+    python cli.py watch --interval 60 --port 8050
+    python cli.py intraday --interval 10 -n 20 50
+    python cli.py futures-tidy --path E:\\NewFolder\\gushi\\期货成交明细
+
+启动耗时可以通过python -X importtime cli.py top20 2> importtime.log查看
+"""
+import argparse
+import datetime
+
+
+def parse_date(value) -> datetime.date:
+    """解析日期参数,格式例如20251013"""
+    return datetime.datetime.strptime(value, "%Y%m%d").date()
+
+
+def load_data_api(args):
+    """导入data_api并按参数设置数据路径"""
+    import data_api
+    if args.data_path is not None:
+        data_api.data_path = args.data_path
+    if args.tdx_path is not None:
+        data_api.tdx_path = args.tdx_path
+    return data_api
+
+
+def date_range(data_api, args):
+    """未指定起止日期时使用data_api.get_trade_date的日期范围"""
+    if args.start is None and args.end is None:
+        return data_api.get_trade_date()
+    dates = data_api.trade_date()["trade_date"]
+    dates = dates[dates < datetime.date.today()]
+    if args.start is not None:
+        dates = dates[dates >= args.start]
+    if args.end is not None:
+        dates = dates[dates <= args.end]
+    return dates.tolist()
+
+
+def output(df, path):
+    """打印结果,指定了path时同时保存为csv文件"""
+    print(df.to_string())
+    if path is not None:
+        df.to_csv(path, encoding="utf-8-sig")
+
+
+def report(args):
+    """生成每日报表"""
+    data_api = load_data_api(args)
+    if args.local_total:
+        data_api.local_total = True
+    if args.table_file is not None:
+        data_api.table_file = args.table_file
+    if args.profile is not None:
+        data_api.profile_engine = args.profile
+    data_api.run()
+
+
+def top20(args):
+    """输出沪深每日成交额前N名的合计,单位(亿元)"""
+    import pandas as pd
+    data_api = load_data_api(args)
+    dates = date_range(data_api, args)
+    output(pd.DataFrame({f"前{args.n}名": data_api.get_top20_summary(dates, args.n)}, index=dates), args.output)
+
+
+def summaries(args):
+    """输出交易所及各板块、指数的成交额,单位(亿元)"""
+    import pandas as pd
+    data_api = load_data_api(args)
+    dates = date_range(data_api, args)
+    df = pd.DataFrame(index=dates)
+    if args.local:
+        df["沪深两市"] = data_api.get_local_summary(dates)
+    else:
+        df["深圳交易所"] = data_api.get_szse_summary(dates)
+        df["上海交易所"] = data_api.get_shse_summary(dates)
+    boards = data_api.get_board_summary(dates, list(data_api.boards.values()))
+    for name, symbol in data_api.boards.items():
+        df[name] = boards[symbol]
+    output(df.round(2), args.output)
+
+
+def concentration(args):
+    """输出沪深A股每日成交额的集中度,默认为全部历史"""
+    data_api = load_data_api(args)
+    output(data_api.get_concentration(args.start, args.end, chunk_days=args.chunk_days), args.output)
+
+
+def watch(args):
+    """常驻运行,日线文件被修改时重新计算报表,并通过本地HTTP提供报表"""
+    data_api = load_data_api(args)
+    import watch
+    if args.table_file is not None:
+        data_api.table_file = args.table_file
+    watch.watch(args.interval, args.host, args.port)
+
+
+def intraday(args):
+    """盘中每隔interval秒输出一次沪深A股前N名、各板块的成交额占比"""
+    import time
+    data_api = load_data_api(args)
+    engine = data_api.intraday_engine(args.date, args.freq, args.n)
+    while True:
+        bars = engine.tick()
+        snapshot = engine.snapshot()
+        shares = ", ".join(f"{key}:{value:.2f}%" for key, value in snapshot.items() if key.endswith("占比"))
+        print(f"{snapshot['时间']} 新增{bars}条记录, 成交额{snapshot['成交额合计'] / 100000000:.2f}亿元, {shares}")
+        if args.output is not None:
+            engine.intervals().to_csv(args.output, encoding="utf-8-sig")
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+def futures_tidy(args):
+    """整理期货的交易数据"""
+    import os
+    import tidy_qihuo
+    if args.path is not None:
+        tidy_qihuo.path = args.path
+        tidy_qihuo.cache_dir = os.path.join(os.path.dirname(args.path), "成交明细缓存")
+    if args.products is not None:
+        tidy_qihuo.products = None if args.products == ["all"] else tuple(args.products)
+    if args.policy is not None:
+        tidy_qihuo.policy = args.policy
+    tidy_qihuo.main()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="股票数据及期货交易数据的整理工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, func, dates=True):
+        sub = subparsers.add_parser(name, help=func.__doc__)
+        sub.set_defaults(func=func)
+        sub.add_argument("--data-path", help="缓存数据的文件夹,默认为data_api.data_path")
+        sub.add_argument("--tdx-path", help="通达信的安装目录,默认为data_api.tdx_path")
+        if dates:
+            sub.add_argument("--start", type=parse_date, help="开始日期,例如20251013")
+            sub.add_argument("--end", type=parse_date, help="结束日期,例如20251031")
+            sub.add_argument("--output", help="将结果保存为csv文件")
+        return sub
+
+    sub = add_command("report", report, dates=False)
+    sub.add_argument("--local-total", action="store_true", help="沪深两市成交额由通达信日线汇总")
+    sub.add_argument("--table-file", help="输出的表格文件,扩展名为png、html或svg")
+    sub.add_argument("--profile", choices=["cprofile", "pyinstrument"], help="性能剖析工具")
+    sub = add_command("top20", top20)
+    sub.add_argument("-n", type=int, default=20, help="前N名")
+    sub = add_command("summaries", summaries)
+    sub.add_argument("--local", action="store_true", help="沪深两市成交额由通达信日线汇总,不访问交易所接口")
+    sub = add_command("concentration", concentration)
+    sub.add_argument("--chunk-days", type=int, default=250, help="每次计算的交易日数")
+    sub = add_command("intraday", intraday, dates=False)
+    sub.add_argument("--date", type=parse_date, help="交易日,默认为今天")
+    sub.add_argument("--freq", type=int, choices=[1, 5], default=1, help="1读取1分钟线,5读取5分钟线")
+    sub.add_argument("-n", type=int, nargs="+", default=[20], help="前N名,可以指定多个")
+    sub.add_argument("--interval", type=float, default=10, help="读取分钟线的间隔(秒)")
+    sub.add_argument("--once", action="store_true", help="只读取一次")
+    sub.add_argument("--output", help="将每分钟的统计保存为csv文件")
+    sub = add_command("watch", watch, dates=False)
+    sub.add_argument("--interval", type=float, default=60, help="检查日线文件的间隔(秒)")
+    sub.add_argument("--host", default="127.0.0.1", help="HTTP服务监听的地址")
+    sub.add_argument("--port", type=int, default=8050, help="HTTP服务监听的端口")
+    sub.add_argument("--table-file", help="输出的表格文件,扩展名为png、html或svg")
+
+    sub = subparsers.add_parser("futures-tidy", help=futures_tidy.__doc__)
+    sub.set_defaults(func=futures_tidy)
+    sub.add_argument("--path", help="结算单所在的文件夹,默认为tidy_qihuo.path")
+    sub.add_argument("--products", nargs="+", help="需要整理的品种,例如IM IC,all表示全部合约")
+    sub.add_argument("--policy", choices=["lifo", "fifo"], help="平仓顺序")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except OSError as e:
+        # requests的连接错误继承自OSError,出错时才导入requests判断
+        from requests.exceptions import ConnectionError
+        if not isinstance(e, ConnectionError):
+            raise
+        print("访问接口地址连接失败,请稍后重试")
+
+
+if __name__ == "__main__":
+    main()
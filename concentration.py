@@ -0,0 +1,72 @@
+"""
+成交额的横截面集中度,每个日期块排序一次,得到前N名占比、赫芬达尔指数、基尼系数及分位数
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Sequence, Tuple
+
+SIZES = (10, 20, 50, 100)
+PERCENTILES = (50, 90, 99)
+
+
+def columns(sizes: Sequence[int] = SIZES, percentiles: Sequence[float] = PERCENTILES) -> list:
+    """concentration结果的列名"""
+    return (["股票数", "成交额合计"] + [f"前{n}占比" for n in sizes] + ["HHI", "基尼系数"]
+            + [f"成交额P{q:g}" for q in percentiles])
+
+
+def concentration(amount: np.ndarray, sizes: Sequence[int] = SIZES,
+                  percentiles: Sequence[float] = PERCENTILES) -> Dict[str, np.ndarray]:
+    """计算每个日期的成交额集中度,nan视为当日没有交易
+
+    Args:
+        amount (np.ndarray): 日期×股票的成交额
+        sizes (Sequence[int]): 计算前N名占比(百分比)的N
+        percentiles (Sequence[float]): 成交额的分位数,按线性插值计算,与np.percentile一致
+
+    Returns:
+        列名见columns,每列为各日期的值,没有交易的日期为nan
+    """
+    amount = np.asarray(amount, dtype=np.float64)
+    if amount.shape[1] == 0:
+        return {name: np.full(len(amount), np.nan) for name in columns(sizes, percentiles)}
+    width = amount.shape[1]
+    # 降序排列,nan排在最后,每行前count个为有效值
+    desc = -np.sort(-amount, axis=1)
+    count = (~np.isnan(amount)).sum(axis=1)
+    valid = np.arange(width)[None, :] < count[:, None]
+    desc = np.where(valid, desc, 0.0)
+    total = desc.sum(axis=1)
+    cumsum = np.cumsum(desc, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_nan = np.where(total > 0, total, np.nan)
+        rd = {"股票数": count.astype(np.float64), "成交额合计": np.where(count > 0, total, np.nan)}
+        for n in sizes:
+            rd[f"前{n}占比"] = cumsum[:, min(n, width) - 1] / total_nan * 100
+        rd["HHI"] = ((desc / total_nan[:, None]) ** 2).sum(axis=1) * 10000
+        # 基尼系数:升序排名为count - 降序位置
+        rank = np.where(valid, count[:, None] - np.arange(width)[None, :], 0)
+        rd["基尼系数"] = 2 * (rank * desc).sum(axis=1) / (count * total_nan) - (count + 1) / count
+    for q in percentiles:
+        # 升序位置pos对应降序位置count-1-pos
+        pos = q / 100 * (count - 1)
+        low, high = np.floor(pos).astype(np.int64), np.ceil(pos).astype(np.int64)
+        low_value = np.take_along_axis(desc, np.clip(count - 1 - low, 0, width - 1)[:, None], axis=1)[:, 0]
+        high_value = np.take_along_axis(desc, np.clip(count - 1 - high, 0, width - 1)[:, None], axis=1)[:, 0]
+        rd[f"成交额P{q:g}"] = np.where(count > 0, low_value + (high_value - low_value) * (pos - low), np.nan)
+    return rd
+
+
+def concentration_frame(chunks: Iterable[Tuple[Sequence, np.ndarray]], sizes: Sequence[int] = SIZES,
+                        percentiles: Sequence[float] = PERCENTILES) -> pd.DataFrame:
+    """按日期块计算集中度并合并,内存占用只与单个日期块的大小有关
+
+    Args:
+        chunks (Iterable[Tuple[Sequence, np.ndarray]]): (日期, 日期×股票的成交额)的序列
+    """
+    frames = []
+    for dates, amount in chunks:
+        frames.append(pd.DataFrame(concentration(amount, sizes, percentiles), index=list(dates)))
+    if len(frames) == 0:
+        return pd.DataFrame(columns=columns(sizes, percentiles))
+    return pd.concat(frames)[columns(sizes, percentiles)]
@@ -4,5 +4,5 @@ REM 
 REM ʱأWin + Rtaskschd.mscͳƹ
 REM =======================================
 cd E:\py-workspace\stock
-C:\Users\Administrator\miniforge3\envs\py310\python.exe data_api.py
+C:\Users\Administrator\miniforge3\envs\py310\python.exe cli.py report
 pause
\ No newline at end of file
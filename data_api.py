@@ -1,51 +1,133 @@
 """
 使用akshar获取股票数据的API接口
+
+akshare、requests及matplotlib在用到时才导入,只读取缓存及本地日线时不需要加载
 """
 import os
+import sys
 import datetime
+import threading
+import contextlib
 import pandas as pd
 import numpy as np
-import akshare as ak
 from typing import List
-from tqdm import tqdm
 from typing import List
-from mootdx.reader import Reader
-from show_result import create_styled_table
-from requests.exceptions import ConnectionError
+from tdx_reader import board_amount, is_ext, minute_path, lday_snapshot
+from topn import TopNAggregator
+from share import share_frame
+from concentration import SIZES, PERCENTILES, concentration_frame
+from store import DATE_COLUMN, ColumnStore, migrate_csv
+from matrix import AmountMatrix
+from intraday import IntradayEngine
+from fetcher import fetch_all
+from universe import SHSZ_BOARDS, build_index, board_filter, select
+from scheduler import Scheduler
+import metrics
 
 data_path = r"E:\py-workspace\stock\data"
 tdx_path = r'D:\new_tdx'
+scan_workers = os.cpu_count() or 1  # 扫描日线文件的进程数,设为1时单进程读取
+fetch_workers = 4  # 补齐缓存时访问接口的并发数
+fetch_rate = 2.0  # 补齐缓存时每秒最多访问接口的次数
+local_total = False  # 为True时沪深两市成交额由通达信日线汇总,不访问交易所接口
+profile_engine = None  # 性能剖析工具,可选cprofile或pyinstrument,为None时不剖析
+boards = {"沪深300": "62#000300", "微盘股": "880823", "百元股": "880878"}  # 报表中的板块、指数名称及代码
+table_stats = ["占比", "占比涨幅"]  # 表格中输出的统计项,可选share.STATS中的各项
+share_window = 20  # 占比Z值及分位的滚动窗口长度
+matrix_refresh_latest = True  # 更新成交额矩阵时重新读取最新日期写入后被修改的日线文件,常驻模式下由refresh_matrix处理
+table_file = "test.png"  # 输出的表格文件,扩展名为html或svg时不使用matplotlib绘图
 class CustomException(Exception):
     """自定义错误"""
 
+_trade_date = None  # 已读取的(文件路径, 交易日历)
+
 def trade_date():
-    """获取交易日期"""
+    """获取交易日期,同一进程中只读取一次"""
+    global _trade_date
     path = os.path.join(data_path, "trade_date.csv")
+    if _trade_date is not None and _trade_date[0] == path:
+        return _trade_date[1].copy()
     if os.path.exists(path):
         df = pd.read_csv(path)
         df["trade_date"] = pd.to_datetime(df["trade_date"]).dt.date
     else:
-        df = ak.tool_trade_date_hist_sina()
+        import akshare as ak
+        with metrics.span("akshare.tool_trade_date_hist_sina"):
+            df = ak.tool_trade_date_hist_sina()
         df.to_csv(path, index=False)
-    return df
+    _trade_date = (path, df)
+    return df.copy()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store() -> ColumnStore:
+    """获取data_path下的列式存储,首次创建时导入已有的csv缓存"""
+    global _store
+    root = os.path.join(data_path, "store")
+    with _store_lock:
+        if _store is None or _store.root != root:
+            migrate = not os.path.exists(root) and os.path.exists(data_path)
+            _store = ColumnStore(root)
+            if migrate:
+                migrate_csv(data_path, _store)
+    return _store
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+def get_matrix() -> AmountMatrix:
+    """获取data_path下的成交额矩阵"""
+    global _matrix
+    root = os.path.join(data_path, "matrix")
+    with _matrix_lock:
+        if _matrix is None or _matrix.root != root:
+            _matrix = AmountMatrix(root)
+    return _matrix
 
 def cache(name):
-    """单个文件读取的装饰器"""
+    """单日数据读取的装饰器,数据保存在列式存储的name数据集中"""
     def decorator(func):
         def wrapper(date_str, *args, **kwargs):
-            folder = os.path.join(data_path, date_str)
-            if not os.path.exists(folder):
-                os.makedirs(folder)
-            path = os.path.join(folder, f"{name}.csv")
-            if os.path.exists(path):
-                df = pd.read_csv(path)
-            else:
+            store = get_store()
+            df = store.read(name, date_str)
+            if df is None:
+                metrics.count(f"cache.{name}.miss")
                 df: pd.DataFrame = func(date_str, *args, **kwargs)
-                df.to_csv(path, index=False)
+                store.write(name, date_str, df)
+            else:
+                metrics.count(f"cache.{name}.hit")
             return df
+        wrapper.cache_name = name
+        wrapper.fetch = func
         return wrapper
     return decorator
 
+def cache_range(func, date_range: List[datetime.time]) -> pd.DataFrame:
+    """批量读取被cache装饰的数据,结果包含日期列DATE_COLUMN
+
+    缺失的日期并发获取后一次性写入存储,部分日期获取失败时先保存成功的数据再抛出异常
+    """
+    store = get_store()
+    date_strs = [search_date.strftime('%Y%m%d') for search_date in date_range]
+    df = store.read_range(func.cache_name, min(date_strs), max(date_strs))
+    df = df[df[DATE_COLUMN].isin(date_strs)]
+    cached = set(df[DATE_COLUMN])
+    missing = [date_str for date_str in date_strs if date_str not in cached]
+    metrics.count(f"cache.{func.cache_name}.hit", len(date_strs) - len(missing))
+    metrics.count(f"cache.{func.cache_name}.miss", len(missing))
+    if len(missing) == 0:
+        return df.reset_index(drop=True)
+    from requests.exceptions import ConnectionError
+    results, errors = fetch_all(func.fetch, missing, workers=fetch_workers, rate=fetch_rate,
+                                retry_on=(ConnectionError,))
+    if len(results) > 0:
+        store.write_many(func.cache_name, results)
+    if len(errors) > 0:
+        raise errors[min(errors)]
+    frames = [results[date_str].assign(**{DATE_COLUMN: date_str}) for date_str in missing]
+    return pd.concat([df] + frames, ignore_index=True)
+
 @cache("szse_summary")
 def szse_summary(date_str):
     """获取深证交易所的成交数据
@@ -53,7 +135,9 @@ def szse_summary(date_str):
     Args:
         date_str (str): 日期,例如20251011
     """
-    rd = ak.stock_szse_summary(date=date_str)
+    import akshare as ak
+    with metrics.span("akshare.stock_szse_summary"):
+        rd = ak.stock_szse_summary(date=date_str)
     if len(rd) < 14:
         raise CustomException("深圳交易所的每日概况数据还没有更新")
     return rd
@@ -61,29 +145,68 @@ def szse_summary(date_str):
 @cache("shse_summary")
 def shse_summary(date_str):
     """获取上证交易所的成交数据"""
+    import akshare as ak
     try:
-        rd = ak.stock_sse_deal_daily(date=date_str)
+        with metrics.span("akshare.stock_sse_deal_daily"):
+            rd = ak.stock_sse_deal_daily(date=date_str)
     except ValueError:
         raise CustomException("上证交易所的每日概况数据还没有更新")
     return rd
 
-def shsz_amount(date_range: List[datetime.time]) -> List[pd.DataFrame]:
-    """获取沪深两市的成交额数据"""
-    reader = Reader.factory(market="std", tdxdir=tdx_path)
-    rd = []
-    file2pattern = {
-        "sh": ("sh60", "sh688"),
-        "sz": ("sz000", "sz300")
-    }    
-    for key, value in file2pattern.items():
-        spot_list = os.listdir(os.path.join(tdx_path, "vipdoc", key, "lday"))
-        spot_list = [name[2:-4] for name in spot_list if name.startswith(value)]
-        for symbol in tqdm(spot_list):
-            df = reader.daily(symbol=symbol)
-            series = df["amount"].reindex(date_range)
-            rd.append(pd.DataFrame([series.values], columns=date_range, index=[symbol]))
-    rd = pd.concat(rd)
-    return rd
+def shsz_universe() -> pd.DataFrame:
+    """获取沪深A股的股票池索引"""
+    df = build_index(tdx_path, os.path.join(data_path, "universe.csv"))
+    return select(df, [board_filter(*SHSZ_BOARDS)])
+
+def shsz_files():
+    """获取沪深A股的代码、日线文件路径及所属板块"""
+    df = shsz_universe()
+    return df["symbol"].tolist(), df["path"].tolist(), df["board"].tolist()
+
+def intraday_engine(trade_day: datetime.date = None, freq=1, sizes=(20,)) -> IntradayEngine:
+    """创建沪深A股的盘中成交额统计,股票池与shsz_files一致
+
+    Args:
+        trade_day (datetime.date): 统计的交易日,默认为今天
+        freq (int): 1读取1分钟线,5读取5分钟线
+    """
+    df = shsz_universe()
+    paths = [minute_path(tdx_path, market, symbol, freq) for market, symbol in zip(df["market"], df["symbol"])]
+    return IntradayEngine(df["symbol"].tolist(), paths, df["board"].tolist(), list(SHSZ_BOARDS),
+                          trade_day or datetime.date.today(), sizes)
+
+def update_matrix(date_range: List[datetime.time], files=None) -> AmountMatrix:
+    """将缺失的日期及新上市的股票追加到成交额矩阵中"""
+    symbols, paths, _ = shsz_files() if files is None else files
+    stats = lday_snapshot(tdx_path, ("sh", "sz")) if matrix_refresh_latest else None
+    matrix = get_matrix()
+    with _matrix_lock:
+        with metrics.span("matrix.update"):
+            scanned = matrix.update(symbols, paths, date_range, scan_workers, matrix_refresh_latest, stats)
+    metrics.count("matrix.scanned_dates", len(scanned))
+    return matrix
+
+def refresh_matrix(paths: List[str], date_range: List[datetime.time]) -> int:
+    """重新读取被修改的日线文件在date_range中的成交额,不属于沪深A股的文件忽略,返回重新读取的文件数"""
+    symbols, all_paths, _ = shsz_files()
+    changed = set(os.path.normcase(os.path.abspath(path)) for path in paths)
+    index = [i for i, path in enumerate(all_paths) if os.path.normcase(os.path.abspath(path)) in changed]
+    matrix = get_matrix()
+    with _matrix_lock:
+        with metrics.span("matrix.refresh"):
+            return matrix.refresh([symbols[i] for i in index], [all_paths[i] for i in index], date_range, scan_workers)
+
+def shsz_matrix(date_range: List[datetime.time], files=None) -> np.ndarray:
+    """获取沪深A股的成交额,行为日期,列为股票"""
+    files = shsz_files() if files is None else files
+    matrix = update_matrix(date_range, files)
+    with _matrix_lock:
+        return matrix.select(date_range, files[0])
+
+def shsz_amount(date_range: List[datetime.time], files=None) -> pd.DataFrame:
+    """获取沪深两市的成交额数据,行为股票代码,列为日期"""
+    symbols = (shsz_files() if files is None else files)[0]
+    return pd.DataFrame(shsz_matrix(date_range, files).T, index=symbols, columns=date_range)
 
 def get_trade_date() -> List[datetime.time]:
     """获取交易日历"""
@@ -101,69 +224,142 @@ def get_trade_date() -> List[datetime.time]:
 
 def get_szse_summary(date_range: List[datetime.time]) -> List[float]:
     """获取深圳证券交易所的成交数据,单位(亿元)"""
-    rd = []
-    for search_date in date_range:
-        search_date = search_date.strftime('%Y%m%d')
-        df = szse_summary(search_date)
-        df = df.loc[df["证券类别"].isin(["主板A股", "创业板A股"])]
-        rd.append(df["成交金额"].sum() / 100000000)
-    return rd
+    df = cache_range(szse_summary, date_range)
+    df = df.loc[df["证券类别"].isin(["主板A股", "创业板A股"])]
+    rd = df.groupby(DATE_COLUMN)["成交金额"].sum() / 100000000
+    return rd.reindex([search_date.strftime('%Y%m%d') for search_date in date_range]).tolist()
 
 def get_shse_summary(date_range: List[datetime.time]) -> List[float]:
     """获取上证证券交易所的成交数据,单位(亿元)"""
-    rd = []
-    for search_date in date_range:
-        search_date = search_date.strftime('%Y%m%d')
-        df = shse_summary(search_date)
-        df = df.loc[df["单日情况"] == "成交金额", ["主板A", "科创板"]]
-        rd.append(df.iloc[0].sum())
-    return rd
+    df = cache_range(shse_summary, date_range)
+    df = df.loc[df["单日情况"] == "成交金额"].drop_duplicates(DATE_COLUMN)
+    rd = df.set_index(DATE_COLUMN)[["主板A", "科创板"]].sum(axis=1)
+    return rd.reindex([search_date.strftime('%Y%m%d') for search_date in date_range]).tolist()
+
+def shsz_summary(date_range: List[datetime.time], n=20) -> pd.DataFrame:
+    """获取沪深每日成交额前N名的合计及各板块的成交额合计,单位(元)
+
+    数据取自成交额矩阵,只读取矩阵中缺失的日期;按日期块读取矩阵的切片统计,不复制整个日期×股票矩阵
+
+    Returns:
+        行为日期,列为"前N名"及SHSZ_BOARDS中的各板块
+    """
+    symbols, paths, boards = shsz_files()
+    matrix = update_matrix(date_range, (symbols, paths, boards))
+    board_names = list(SHSZ_BOARDS)
+    rd = np.zeros((len(date_range), 1 + len(board_names)))
+    with _matrix_lock:
+        # 矩阵的列按写入顺序排列,不属于当前股票池的列不参与统计
+        codes = np.full(len(matrix.symbols), -1, dtype=np.int64)
+        codes[matrix.columns(symbols)] = [board_names.index(board) for board in boards]
+        members = np.flatnonzero(codes >= 0)
+        for positions, block in matrix.row_chunks(date_range):
+            if len(members) < len(codes):
+                block = block[:, members]
+            top = TopNAggregator(len(positions), (n,))
+            top.add(members, block.T)
+            _, values = top.result(n)
+            rd[positions, 0] = np.nansum(values, axis=0)
+            for k in range(len(board_names)):
+                rd[positions, k + 1] = np.nansum(block[:, codes[members] == k], axis=1, dtype=np.float64)
+    return pd.DataFrame(rd, index=date_range, columns=["前N名"] + board_names)
 
-def get_top20_summary(date_range: List[datetime.time]) -> List[float]:
+def get_top20_summary(date_range: List[datetime.time], n=20) -> List[float]:
     """获取沪深每日成交额前20的总计额度,单位(亿元)"""
-    df: pd.DataFrame = shsz_amount(date_range)
-    rd = []
-    for col in df.columns:
-        top20_amount = df[col].nlargest(20).sum()
-        rd.append(top20_amount / 100000000)
-    return rd
+    return (shsz_summary(date_range, n)["前N名"] / 100000000).tolist()
+
+def get_concentration(start_date: datetime.date = None, end_date: datetime.date = None,
+                      sizes=SIZES, percentiles=PERCENTILES, chunk_days=250) -> pd.DataFrame:
+    """获取沪深A股每日成交额的集中度,默认为交易日历中的全部历史
+
+    成交额矩阵缺失的日期先扫描日线文件补齐,之后按chunk_days个交易日分块计算
+
+    Returns:
+        行为日期,列为股票数、成交额合计(元)、前N名占比(%)、HHI、基尼系数及成交额分位数(元)
+    """
+    today = datetime.date.today()
+    dates = trade_date()["trade_date"]
+    dates = dates[(dates < today) & (dates >= (start_date or dates.min())) & (dates <= (end_date or today))].tolist()
+    files = shsz_files()
+    matrix = update_matrix(dates, files)
+
+    def chunks():
+        with _matrix_lock:
+            columns = np.sort(matrix.columns(files[0]))
+            for positions, block in matrix.row_chunks(dates, chunk_days):
+                yield [dates[i] for i in positions], block[:, columns]
+
+    with metrics.span("concentration"):
+        return concentration_frame(chunks(), sizes, percentiles)
+
+def get_local_summary(date_range: List[datetime.time]) -> List[float]:
+    """由通达信日线汇总沪深两市主板、科创板及创业板的成交额,单位(亿元)"""
+    df = shsz_summary(date_range)
+    return (df[list(SHSZ_BOARDS)].sum(axis=1) / 100000000).tolist()
+
+def reconcile_summary(date_range: List[datetime.time], df: pd.DataFrame = None) -> pd.DataFrame:
+    """将本地汇总的各板块成交额与已缓存的交易所每日概况对比,单位(亿元)
+
+    只读取已缓存的交易所数据,不访问接口,df为已获取的shsz_summary结果
+    """
+    date_strs = [search_date.strftime('%Y%m%d') for search_date in date_range]
+    df = shsz_summary(date_range) if df is None else df
+    local = df[list(SHSZ_BOARDS)] / 100000000
+    local.index = date_strs
+    exchange = pd.DataFrame(np.nan, index=date_strs, columns=list(SHSZ_BOARDS))
+    store = get_store()
+    sz = store.read_range("szse_summary", min(date_strs), max(date_strs))
+    if len(sz) > 0:
+        sz = sz.pivot_table(index=DATE_COLUMN, columns="证券类别", values="成交金额", aggfunc="sum")
+        exchange["深市主板"] = sz["主板A股"] / 100000000
+        exchange["创业板"] = sz["创业板A股"] / 100000000
+    sh = store.read_range("shse_summary", min(date_strs), max(date_strs))
+    if len(sh) > 0:
+        sh = sh.loc[sh["单日情况"] == "成交金额"].drop_duplicates(DATE_COLUMN).set_index(DATE_COLUMN)
+        exchange["沪市主板"] = sh["主板A"]
+        exchange["科创板"] = sh["科创板"]
+    rd = pd.concat({"本地": local, "交易所": exchange, "差异%": (local - exchange) / exchange * 100}, axis=1)
+    return rd.round(2)
+
+def get_board_summary(date_range: List[datetime.time], symbols: List[str]) -> pd.DataFrame:
+    """一次读取多个板块、指数的历史成交额数据,行对应日期,列对应代码,单位(亿元)
+
+    Args:
+        symbols (List[str]): 概念板块代码例如880823,扩展市场的指数代码例如62#000300
+    """
+    with metrics.span("tdx.board_amount"):
+        matrix = board_amount(tdx_path, symbols, date_range, scan_workers if len(symbols) > 256 else 1)
+    # 扩展市场的成交额单位为百万元,标准市场为元
+    scale = np.array([100 if is_ext(symbol) else 100000000 for symbol in symbols])
+    return pd.DataFrame(matrix / scale, index=date_range, columns=symbols)
+
 
 def get_index_summary(date_range: List[datetime.time], symbol) -> List[float]:
     """获取指数概念的历史成交额数据"""
-    reader = Reader.factory(market='ext', tdxdir=tdx_path)
-    df = reader.daily(symbol=symbol)
-    series = df["hk_stock_amount"].reindex(date_range)
-    series = series / 100
-    return series.tolist()
+    return get_board_summary(date_range, [symbol])[symbol].tolist()
 
 
 def get_concept_summary(date_range: List[datetime.time], symbol) -> List[float]:
     """获取概念板块的历史成交额数据,单位(亿元)"""
-    reader = Reader.factory(market='std', tdxdir=tdx_path)
-    df = reader.daily(symbol=symbol)
-    series = df["amount"].reindex(date_range)
-    series = series / 100000000
-    return series.tolist()
+    return get_board_summary(date_range, [symbol])[symbol].tolist()
     
 
-def data2html(dates, total, hs300, micro, hundred, top20):
-    df_source = pd.DataFrame({
-        "沪深两市": total,
-        "沪深300": hs300,
-        "微盘股": micro,
-        "百元股": hundred,
-        "沪深前20": top20
-    }, index=dates)
+def data2html(dates, total, board_df: pd.DataFrame, top20):
+    """计算boards中各板块及沪深前20占沪深两市成交额的统计项并输出表格
+
+    Args:
+        board_df (pd.DataFrame): get_board_summary的结果,列为板块代码
+    """
+    names = list(boards) + ["沪深前20"]
+    values = np.column_stack([board_df[list(boards.values())].to_numpy(), top20])
     # 计算占比和涨幅
-    df_result = pd.DataFrame(index=dates)
-    names = df_source.columns[df_source.columns != "沪深两市"].tolist()
-    for col in names:
-        df_result[col+'_占比'] = df_source[col] / df_source['沪深两市'] * 100
-        df_result[col+'_占比涨幅'] = df_result[f"{col}_占比"].pct_change(fill_method=None) * 100
-    df_result = df_result.round(2)
+    df_result = share_frame(values, np.asarray(total, dtype=float), names, dates, share_window, table_stats)
+    df_result = df_result.astype(float).round(2)
     df_result = df_result.reset_index(names='日期')
     # 输出展示图表
-    create_styled_table(df_result, [name for name in df_result.columns if "涨幅" in name])
+    with metrics.span("show_result.create_styled_table"):
+        from show_result import create_styled_table
+        create_styled_table(df_result, [name for name in df_result.columns if "涨幅" in name], table_file)
     # 创建图表
     # fig = make_subplots(
     #     rows=2, cols=1,
@@ -203,27 +399,56 @@ def data2html(dates, total, hs300, micro, hundred, top20):
     # # 保存为离线 HTML 文件
     # fig.write_html('股市大盘分析图表.html', auto_open=False)
     # print("已保存为离线html文件")
+    return df_result
+
 def main():
-    """主函数"""
-    trade_date = get_trade_date()
-    print("获取股市成交额前20的合计成交额")
-    top20_amount = get_top20_summary(trade_date)
-    print("获取深圳交易所成交数据")
-    sz_amount = get_szse_summary(trade_date)
-    print("获取上海交易所成交数据")
-    sh_amount = get_shse_summary(trade_date)
-    total_amout = (np.array(sz_amount) + np.array(sh_amount)).tolist()
-    print("获取沪深300成交数据")
-    hs300_amount = get_index_summary(trade_date, '62#000300')
-    print("获取微盘股成交数据")
-    micro_amount = get_concept_summary(trade_date, "880823")
-    print("获取百元股成交数据")
-    hundred_amount = get_concept_summary(trade_date, "880878")
-    print("将数据转化成所需图表")
-    data2html(trade_date, total_amout, hs300_amount, micro_amount, hundred_amount, top20_amount)
+    """主函数,没有依赖关系的步骤并发执行,返回各步骤的结果"""
+    scheduler = Scheduler()
+    scheduler.add("交易日历", get_trade_date)
+    if local_total:
+        scheduler.add("沪深日线汇总", shsz_summary, ["交易日历"])
+        scheduler.add("成交额前20", lambda df: (df["前N名"] / 100000000).tolist(), ["沪深日线汇总"])
+        scheduler.add("沪深两市", lambda df: (df[list(SHSZ_BOARDS)].sum(axis=1) / 100000000).tolist(), ["沪深日线汇总"])
+        scheduler.add("交易所对账", lambda dates, df: print(reconcile_summary(dates, df).to_string()), ["交易日历", "沪深日线汇总"])
+    else:
+        scheduler.add("成交额前20", get_top20_summary, ["交易日历"])
+        scheduler.add("深圳交易所", get_szse_summary, ["交易日历"])
+        scheduler.add("上海交易所", get_shse_summary, ["交易日历"])
+        scheduler.add("沪深两市", lambda sz, sh: (np.array(sz) + np.array(sh)).tolist(), ["深圳交易所", "上海交易所"])
+    scheduler.add("板块指数", lambda dates: get_board_summary(dates, list(boards.values())), ["交易日历"])
+    scheduler.add("生成图表", data2html, ["交易日历", "沪深两市", "板块指数", "成交额前20"], inline=True)
+    return scheduler.run()
+
+def run():
+    """执行主函数并在data_path/reports下保存运行报告,设置了profile_engine时同时保存性能剖析结果
+
+    剖析时扫描日线文件改为单进程,以便剖析结果包含子进程中的读取
+    """
+    global scan_workers
+    folder = os.path.join(data_path, "reports")
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    name = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    workers = scan_workers
+    if profile_engine is None:
+        profiler = contextlib.nullcontext()
+    else:
+        scan_workers = 1
+        suffix = "html" if profile_engine == "pyinstrument" else "prof"
+        profiler = metrics.profile(os.path.join(folder, f"{name}.{suffix}"), profile_engine)
+    status = "error"
+    try:
+        with profiler, metrics.span("main"):
+            main()
+        status = "ok"
+    finally:
+        scan_workers = workers
+        metrics.write_report(os.path.join(folder, f"{name}.json"), started=name, status=status,
+                             modules=len(sys.modules))
 
 if __name__ == "__main__":
+    from requests.exceptions import ConnectionError
     try:
-        main()
+        run()
     except ConnectionError as e:
         print("访问接口地址连接失败,请稍后重试")
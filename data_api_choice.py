@@ -3,9 +3,23 @@
 """
 import os
 import datetime
+import numpy as np
 import pandas as pd
+import requests
 import akshare as ak
-from typing import List
+from typing import List, Tuple
+from requests.adapters import HTTPAdapter
+from fetcher import fetch_all
+
+hist_url = "https://push2his.eastmoney.com/api/qt/stock/kline/get"  # 东方财富日K线接口,测试时可指向本地服务
+fetch_workers = 8  # 获取个股历史数据的并发数
+fetch_rate = 10.0  # 每秒最多访问接口的次数
+fetch_retries = 5  # 连接失败或服务端出错时的最大重试次数
+fetch_timeout = 10  # 单次请求的超时时间(秒)
+
+
+class RetryableHTTPError(requests.exceptions.HTTPError):
+    """服务端出错(5xx)或请求过于频繁(429),可以退避后重试;其他4xx为请求本身有误,重试无效"""
 
 def get_trade_date() -> List[datetime.time]:
     """获取交易日历"""
@@ -43,26 +57,77 @@ def get_dfcf_concept_summary(date_range: List[datetime.time], name) -> List[floa
     df = ak.stock_board_concept_hist_em(symbol=name, period="daily", start_date=st, end_date=ed, adjust="qfq")
     return df["成交金额"].tolist()
 
-def get_top20_summary(date_range: List[datetime.time]) -> List[float]:
-    """获取沪深每日成交额前20的总计额度"""
+def hist_session(workers=fetch_workers) -> requests.Session:
+    """创建复用连接的会话,连接池大小与并发数一致"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get_hist_amount(session: requests.Session, code, st, ed) -> Tuple[np.ndarray, np.ndarray]:
+    """获取个股的前复权日K线成交额,请求参数与ak.stock_zh_a_hist一致
+
+    Returns:
+        (日期数组,格式例如2025-10-13, 成交额数组)
+    """
+    params = {
+        "fields1": "f1,f2,f3,f4,f5,f6",
+        "fields2": "f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61,f116",
+        "ut": "7eea3edcaed734bea9cbfc24409ed989",
+        "klt": "101",
+        "fqt": "1",
+        "secid": f"{1 if code.startswith('6') else 0}.{code}",
+        "beg": st,
+        "end": ed,
+    }
+    response = session.get(hist_url, params=params, timeout=fetch_timeout)
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 429 or e.response.status_code >= 500:
+            raise RetryableHTTPError(*e.args, response=e.response) from e
+        raise
+    data = response.json().get("data") or {}
+    klines = [line.split(",") for line in data.get("klines") or []]
+    # 字段依次为日期、开盘、收盘、最高、最低、成交量、成交额
+    return np.array([line[0] for line in klines], dtype=str), np.array([line[6] for line in klines], dtype=float)
+
+def get_top20_summary(date_range: List[datetime.time], n=20) -> List[float]:
+    """获取沪深每日成交额前20的总计额度
+
+    个股历史数据通过复用连接的会话并发获取,连接失败、服务端出错或限流时退避重试,
+    其他4xx错误不重试并取消剩余请求,全部获取后一次性组装为股票×日期矩阵
+    """
     st = date_range[0].strftime('%Y%m%d')
     ed = date_range[-1].strftime('%Y%m%d')
     code1 = ak.stock_sh_a_spot_em()["代码"].tolist()  # 所有上证A股代码
     code2 = ak.stock_sz_a_spot_em()["代码"].tolist()  # 所有深证A股代码
     code3 = ak.stock_cy_a_spot_em()["代码"].tolist()  # 所有创业板A股代码
     code4 = ak.stock_kc_a_spot_em()["代码"].tolist()  # 所有科创板代码
-    code_list = code1 + code2 + code3 + code4
-    df_total = pd.DataFrame(columns=["日期"])
-    for code in code_list:
-        df = ak.stock_zh_a_hist(symbol=code, period="daily", start_date=st, end_date=ed, adjust="qfq")
-        df = df[["日期", "成交额"]]
-        df = df.rename(columns={'成交额': code})
-        df_total = pd.merge(df_total, df, on='日期', how='outer').fillna(0)
-    df.drop(columns='日期')
-    rd = []
-    for _, row in df_total.iterrows():
-        rd.append(row.nlargest(20).sum())
-    return rd
+    code_list = list(dict.fromkeys(code1 + code2 + code3 + code4))
+    session = hist_session(fetch_workers)
+    try:
+        results, errors = fetch_all(lambda code: get_hist_amount(session, code, st, ed), code_list,
+                                    workers=fetch_workers, rate=fetch_rate, retries=fetch_retries,
+                                    retry_on=(requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                                              RetryableHTTPError), fail_fast=True)
+    finally:
+        session.close()
+    if len(errors) > 0:
+        raise errors[min(errors)]
+    if len(code_list) == 0:
+        return [0.0] * len(date_range)
+    # 所有股票的(行号, 日期, 成交额)拼接后一次写入矩阵,缺失的日期为0
+    rows = np.concatenate([np.full(len(results[code][0]), i) for i, code in enumerate(code_list)])
+    dates = np.concatenate([results[code][0] for code in code_list])
+    amounts = np.concatenate([results[code][1] for code in code_list])
+    columns = pd.Index([search_date.strftime('%Y-%m-%d') for search_date in date_range]).get_indexer(dates)
+    matrix = np.zeros((len(code_list), len(date_range)))
+    matrix[rows[columns >= 0], columns[columns >= 0]] = amounts[columns >= 0]
+    if len(code_list) > n:
+        matrix = np.partition(matrix, len(code_list) - n, axis=0)[-n:]
+    return matrix.sum(axis=0).tolist()
     
 
 def main():
@@ -0,0 +1,84 @@
+"""
+并发获取接口数据,带并发数限制、令牌桶限速及连接失败时的指数退避重试
+"""
+import time
+import threading
+import metrics
+from typing import Callable, Dict, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class TokenBucket:
+    """令牌桶限速器,线程安全
+
+    Args:
+        rate (float): 每秒生成的令牌数,即平均每秒允许的请求次数
+        capacity (int): 令牌桶容量,即允许的突发请求次数
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """获取一个令牌,令牌不足时等待"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def retry_call(func: Callable, key, bucket: TokenBucket, retry_on: Tuple[type, ...], retries=5, backoff=1.0):
+    """限速调用func(key),出现retry_on中的异常时按backoff*2^n秒退避后重试"""
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            return func(key)
+        except retry_on:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_all(func: Callable, keys: Iterable, workers=4, rate=2.0, retries=5, backoff=1.0,
+              retry_on: Tuple[type, ...] = (ConnectionError,), fail_fast=False):
+    """并发调用func获取每个key的数据
+
+    Args:
+        func (Callable): 获取单个key数据的函数
+        workers (int): 最大并发数
+        rate (float): 每秒最多发起的请求数
+        retries (int): 连接失败时的最大重试次数
+        backoff (float): 首次重试前等待的秒数,之后每次翻倍
+        retry_on (Tuple[type, ...]): 需要重试的异常类型
+        fail_fast (bool): 为True时出现第一个失败后取消尚未开始的请求,用于任一失败即放弃全部结果的场景
+
+    Returns:
+        (成功结果的字典, 失败异常的字典),均以key为键
+    """
+    bucket = TokenBucket(rate, capacity=workers)
+    results: Dict = {}
+    errors: Dict = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {key: executor.submit(metrics.profiled(retry_call), func, key, bucket, retry_on, retries, backoff) for key in keys}
+        keys_of = {future: key for key, future in futures.items()}
+        for future in as_completed(keys_of) if fail_fast else futures.values():
+            key = keys_of[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = e
+                if fail_fast:
+                    for other in futures.values():
+                        other.cancel()
+                    break
+    return results, errors
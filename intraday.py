@@ -0,0 +1,144 @@
+"""
+盘中成交额集中度,增量读取通达信分钟线文件新追加的记录,按分钟累计前N名、各板块及全市场的成交额
+"""
+import os
+import datetime
+import numpy as np
+import pandas as pd
+import metrics
+from typing import Dict, Sequence
+from tdx_reader import decode_minute_date, date2int, read_minute_from
+
+MINUTES = 24 * 60  # 每日的分钟数,按当日0点起的分钟数记录各分钟的数据
+
+
+class IntradayEngine:
+    """盘中成交额的增量统计,每次tick只读取各分钟线文件新追加的记录
+
+    股票的当日累计成交额只增不减,只有本次有新记录的股票可能进入前N名,
+    因此每分钟只需在上一次的前N名与本次更新的股票中重新选择
+
+    Args:
+        symbols (Sequence[str]): 股票代码
+        paths (Sequence[str]): 与symbols对应的分钟线文件路径
+        boards (Sequence[str]): 与symbols对应的板块
+        board_names (Sequence[str]): 需要统计的板块
+        trade_day (datetime.date): 统计的交易日
+        sizes (Sequence[int]): 需要统计的前N名
+    """
+
+    def __init__(self, symbols: Sequence[str], paths: Sequence[str], boards: Sequence[str],
+                 board_names: Sequence[str], trade_day: datetime.date, sizes: Sequence[int] = (20,)):
+        self.symbols = np.array(symbols)
+        self.paths = list(paths)
+        self.board_names = list(board_names)
+        self.board_codes = np.array([self.board_names.index(board) for board in boards], dtype=np.int64)
+        self.trade_day = trade_day
+        self.sizes = tuple(sorted(set(sizes)))
+        self.reset()
+
+    def reset(self):
+        """清空统计结果,下次tick从当日第一条记录开始读取"""
+        self.offsets = np.full(len(self.paths), -1, dtype=np.int64)  # 各文件下次读取的字节偏移
+        self.amount = np.zeros(len(self.paths))  # 各股票的当日累计成交额
+        self.minute_amount = np.zeros((len(self.board_names), MINUTES))  # 各板块每分钟的成交额
+        self.top = np.zeros(0, dtype=np.int64)  # 当前累计成交额前N名的股票序号
+        self.top_sums = np.full((len(self.sizes), MINUTES), np.nan)  # 每分钟处理完时前N名的累计成交额合计
+        self.seen = np.zeros(MINUTES, dtype=bool)  # 已有记录的分钟
+
+    def _read(self):
+        """读取所有文件新追加的记录,返回(股票序号, 分钟, 成交额),有文件变小时重新统计"""
+        index, minutes, amounts = [], [], []
+        day = date2int(self.trade_day)
+        for i, path in enumerate(self.paths):
+            if self.offsets[i] >= 0:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if size == self.offsets[i]:
+                    continue
+                if size < self.offsets[i]:
+                    # 文件被重写,已累计的数据不再可靠
+                    metrics.count("intraday.reset")
+                    self.reset()
+                    return self._read()
+            records, self.offsets[i] = read_minute_from(path, int(self.offsets[i]), self.trade_day)
+            records = records[decode_minute_date(records["date"]) == day]
+            if len(records) > 0:
+                index.append(np.full(len(records), i, dtype=np.int64))
+                minutes.append(records["minute"].astype(np.int64))
+                amounts.append(records["amount"].astype(np.float64))
+        if len(index) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        return np.concatenate(index), np.concatenate(minutes), np.concatenate(amounts)
+
+    def _update_top(self, updated: np.ndarray):
+        """在上一次的前N名及本次更新的股票中重新选择前N名"""
+        candidates = np.union1d(self.top, updated)
+        capacity = self.sizes[-1]
+        if len(candidates) > capacity:
+            keep = np.argpartition(-self.amount[candidates], capacity - 1)[:capacity]
+            candidates = candidates[keep]
+        self.top = candidates[np.argsort(-self.amount[candidates], kind="stable")]
+
+    def tick(self) -> int:
+        """读取新追加的记录并更新统计,返回新记录的条数"""
+        with metrics.span("intraday.tick"):
+            index, minutes, amounts = self._read()
+            if len(index) == 0:
+                return 0
+            np.add.at(self.minute_amount, (self.board_codes[index], minutes), amounts)
+            self.seen[minutes] = True
+            # 按分钟顺序累计,每分钟记录一次前N名
+            order = np.argsort(minutes, kind="stable")
+            index, minutes, amounts = index[order], minutes[order], amounts[order]
+            bounds = np.flatnonzero(np.diff(minutes)) + 1
+            for group_index, group_amounts, minute in zip(np.split(index, bounds), np.split(amounts, bounds),
+                                                          minutes[np.concatenate([[0], bounds])]):
+                np.add.at(self.amount, group_index, group_amounts)
+                self._update_top(np.unique(group_index))
+                values = self.amount[self.top]
+                for k, n in enumerate(self.sizes):
+                    self.top_sums[k, minute] = values[:n].sum()
+        metrics.count("intraday.bars", len(index))
+        return len(index)
+
+    @property
+    def last_minute(self) -> int:
+        """最新一条记录的分钟,没有记录时为-1"""
+        seen = np.flatnonzero(self.seen)
+        return int(seen[-1]) if len(seen) > 0 else -1
+
+    def snapshot(self) -> Dict:
+        """当前的累计统计:全市场及各板块的成交额(元)及占比、前N名成交额合计及占比(百分比)"""
+        total = self.amount.sum()
+        minute = self.last_minute
+        rd = {"时间": None if minute < 0 else f"{minute // 60:02d}:{minute % 60:02d}", "成交额合计": total}
+        boards = self.minute_amount.sum(axis=1)
+        for name, amount in zip(self.board_names, boards):
+            rd[f"{name}占比"] = amount / total * 100 if total > 0 else np.nan
+        values = self.amount[self.top]
+        for n in self.sizes:
+            rd[f"前{n}名"] = values[:n].sum()
+            rd[f"前{n}占比"] = values[:n].sum() / total * 100 if total > 0 else np.nan
+        rd[f"前{self.sizes[-1]}名股票"] = self.symbols[self.top].tolist()
+        return rd
+
+    def intervals(self) -> pd.DataFrame:
+        """每分钟的统计,行为有记录的分钟,列为当分钟全市场及各板块的成交额、累计成交额及前N名占比
+
+        前N名占比为处理到该分钟时的累计值,该分钟之后才到达的同一分钟记录会更新该值
+        """
+        minutes = np.flatnonzero(self.seen)
+        interval = self.minute_amount[:, minutes]
+        cumulative = np.cumsum(self.minute_amount.sum(axis=0))[minutes]
+        rd = pd.DataFrame(index=[f"{minute // 60:02d}:{minute % 60:02d}" for minute in minutes])
+        rd["成交额"] = interval.sum(axis=0)
+        for name, values in zip(self.board_names, interval):
+            rd[name] = values
+        rd["累计成交额"] = cumulative
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k, n in enumerate(self.sizes):
+                rd[f"前{n}占比"] = self.top_sums[k, minutes] / cumulative * 100
+        return rd
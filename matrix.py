@@ -0,0 +1,226 @@
+"""
+沪深A股成交额的日期×股票矩阵,以float32的npy文件保存并通过内存映射读取,新的日期及新上市的股票追加写入
+"""
+import os
+import json
+import datetime
+import numpy as np
+from typing import Dict, Iterator, List, Sequence, Tuple
+from tdx_reader import changed_files, date2int, scan_amount
+
+BLOCK = 256  # 矩阵预留行列的粒度
+
+
+def int2date(value: int) -> datetime.date:
+    """将整数日期转换为日期,例如20251013"""
+    return datetime.date(value // 10000, value // 100 % 100, value % 100)
+
+
+def _normpath(path) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _capacity(needed: int, current: int) -> int:
+    """空间不足时按倍数扩容,并按BLOCK取整"""
+    size = max(needed, current * 2)
+    return (size + BLOCK - 1) // BLOCK * BLOCK
+
+
+class AmountMatrix:
+    """成交额矩阵,保存在root下的文件中
+
+    amount.npy为float32的矩阵,行对应日期,列对应股票,预留的行列为nan;
+    dates.npy为已写入的int32日期,行按日期升序排列,连续的日期可以直接切片而不复制;
+    symbols.npy为已写入的股票代码,列顺序为写入顺序;
+    stats.json为最新日期写入时各日线文件的(大小, 修改时间),用于判断最新日期需要重新读取的文件
+
+    Args:
+        root (str): 保存的文件夹
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.data = None
+        self.dates = np.zeros(0, dtype=np.int32)
+        self.symbols = np.zeros(0, dtype="<U12")
+        self.stats: Dict[str, tuple] = None
+        if os.path.exists(self._path("amount")):
+            self.data = np.load(self._path("amount"), mmap_mode="r+")
+            self.dates = np.load(self._path("dates"))
+            self.symbols = np.load(self._path("symbols"))
+        if os.path.exists(self._stats_path()):
+            with open(self._stats_path(), "r", encoding="utf-8") as f:
+                self.stats = {path: tuple(stat) for path, stat in json.load(f).items()}
+        self.row_of: Dict[int, int] = {int(value): i for i, value in enumerate(self.dates)}
+        self.column_of: Dict[str, int] = {str(symbol): i for i, symbol in enumerate(self.symbols)}
+
+    def _path(self, name):
+        return os.path.join(self.root, f"{name}.npy")
+
+    def _stats_path(self):
+        return os.path.join(self.root, "stats.json")
+
+    def _reserve(self, rows: int, columns: int):
+        """保证矩阵至少有rows行、columns列,不足时新建更大的文件并复制已有数据"""
+        shape = (0, 0) if self.data is None else self.data.shape
+        if rows <= shape[0] and columns <= shape[1]:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        shape = (_capacity(rows, shape[0]) if rows > shape[0] else shape[0],
+                 _capacity(columns, shape[1]) if columns > shape[1] else shape[1])
+        tmp = self._path("amount.tmp")
+        data = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=shape)
+        data[:] = np.nan
+        if self.data is not None:
+            used = (len(self.dates), len(self.symbols))
+            data[:used[0], :used[1]] = self.data[:used[0], :used[1]]
+        data.flush()
+        del data
+        self.data = None
+        os.replace(tmp, self._path("amount"))
+        self.data = np.load(self._path("amount"), mmap_mode="r+")
+
+    def _sort_rows(self):
+        """补写了更早的日期时按日期重排已写入的行,通过临时文件替换矩阵"""
+        order = np.argsort(self.dates, kind="stable")
+        if np.array_equal(order, np.arange(len(order))):
+            return
+        tmp = self._path("amount.tmp")
+        data = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=self.data.shape)
+        used = len(self.dates)
+        data[:used] = self.data[:used][order]
+        data[used:] = self.data[used:]
+        data.flush()
+        del data
+        self.data = None
+        os.replace(tmp, self._path("amount"))
+        self.data = np.load(self._path("amount"), mmap_mode="r+")
+        self.dates = self.dates[order]
+        self.row_of = {int(value): i for i, value in enumerate(self.dates)}
+
+    def _save_index(self):
+        """先写入矩阵再保存日期、代码及日线文件快照,追加时中断不会引用未写入的数据"""
+        self.data.flush()
+        for name, values in (("dates", self.dates), ("symbols", self.symbols)):
+            tmp = self._path(f"{name}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, values)
+            os.replace(tmp, self._path(name))
+        if self.stats is not None:
+            tmp = self._stats_path() + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.stats, f)
+            os.replace(tmp, self._stats_path())
+
+    def view(self) -> np.ndarray:
+        """已写入部分的矩阵,不复制数据"""
+        if self.data is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self.data[:len(self.dates), :len(self.symbols)]
+
+    def row_chunks(self, date_range: Sequence[datetime.date], rows=64) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """按日期块逐块返回矩阵的切片,date_range中行号连续的日期为view的切片,不复制数据
+
+        Yields:
+            (日期在date_range中的位置, 行对应这些日期、列对应所有已写入股票的矩阵),未写入的日期跳过
+        """
+        index = self.rows(date_range)
+        view = self.view()
+        start = 0
+        while start < len(index):
+            if index[start] < 0:
+                start += 1
+                continue
+            stop = start + 1
+            while stop < len(index) and stop - start < rows and index[stop] == index[stop - 1] + 1:
+                stop += 1
+            yield np.arange(start, stop), view[index[start]:index[stop - 1] + 1]
+            start = stop
+
+    def rows(self, date_range: Sequence[datetime.date]) -> np.ndarray:
+        """日期对应的行号,不存在时为-1"""
+        return np.array([self.row_of.get(date2int(d), -1) for d in date_range], dtype=np.int64)
+
+    def columns(self, symbols: Sequence[str]) -> np.ndarray:
+        """股票代码对应的列号,不存在时为-1"""
+        return np.array([self.column_of.get(symbol, -1) for symbol in symbols], dtype=np.int64)
+
+    def _fill(self, rows: np.ndarray, columns: np.ndarray, paths: Sequence[str],
+              date_range: List[datetime.date], workers: int):
+        """读取日线文件,写入指定的行列"""
+        for offset, chunk in scan_amount(paths, date_range, workers):
+            self.data[np.ix_(rows, columns[offset:offset + len(chunk)])] = chunk.T
+
+    def update(self, symbols: Sequence[str], paths: Sequence[str], date_range: Sequence[datetime.date],
+               workers=1, refresh_latest=True, stats: Dict[str, tuple] = None) -> List[datetime.date]:
+        """追加新上市的股票及新的日期,返回读取了全部日线文件的日期
+
+        新股票补齐已有日期的数据;新日期读取symbols中所有股票的数据。
+        最新一个已写入的日期可能在数据下载完成前写入,refresh_latest为True且在date_range中时重新读取:
+        给出stats且保存了写入时的快照时只重新读取大小或修改时间发生变化的文件,否则重新读取所有文件
+
+        Args:
+            symbols (Sequence[str]): 股票代码
+            paths (Sequence[str]): 与symbols对应的日线文件路径
+            stats (Dict[str, tuple]): 读取前日线文件的(大小, 修改时间),见tdx_reader.lday_snapshot
+        """
+        new = [i for i, symbol in enumerate(symbols) if symbol not in self.column_of]
+        if len(new) > 0:
+            self._reserve(len(self.dates), len(self.symbols) + len(new))
+            start = len(self.symbols)
+            self.symbols = np.concatenate([self.symbols, np.array([symbols[i] for i in new])])
+            self.column_of.update({symbols[i]: start + k for k, i in enumerate(new)})
+            if len(self.dates) > 0:
+                self._fill(np.arange(len(self.dates)), np.arange(start, len(self.symbols)),
+                           [paths[i] for i in new], [int2date(int(value)) for value in self.dates], workers)
+        latest = int(self.dates.max()) if len(self.dates) > 0 and refresh_latest else None
+        check_latest = latest is not None and latest in {date2int(d) for d in date_range}
+        stale = []  # 最新日期写入后被修改、需要重新读取该日期的文件
+        rescan_latest = check_latest
+        if check_latest and stats is not None and self.stats is not None:
+            changed = {_normpath(path) for path in changed_files(self.stats, stats)}
+            added = set(new)
+            stale = [i for i, path in enumerate(paths) if i not in added and _normpath(path) in changed]
+            rescan_latest = False
+        scan = sorted({d for d in date_range if date2int(d) not in self.row_of
+                       or (rescan_latest and date2int(d) == latest)})
+        if len(scan) > 0:
+            append = [date2int(d) for d in scan if date2int(d) not in self.row_of]
+            self._reserve(len(self.dates) + len(append), len(self.symbols))
+            start = len(self.dates)
+            self.dates = np.concatenate([self.dates, np.array(append, dtype=np.int32)])
+            self.row_of.update({value: start + k for k, value in enumerate(append)})
+            self._fill(self.rows(scan), self.columns(symbols), paths, scan, workers)
+            self._sort_rows()
+        if len(stale) > 0:
+            day = [int2date(latest)]
+            self._fill(self.rows(day), self.columns([symbols[i] for i in stale]), [paths[i] for i in stale],
+                       day, workers)
+        # 最新日期已按当前的日线文件读取时才更新快照
+        update_stats = stats is not None and (check_latest or len(scan) > 0) and stats != self.stats
+        if update_stats:
+            self.stats = dict(stats)
+        if len(new) > 0 or len(scan) > 0 or len(stale) > 0 or update_stats:
+            self._save_index()
+        return scan
+
+    def refresh(self, symbols: Sequence[str], paths: Sequence[str], date_range: Sequence[datetime.date],
+                workers=1) -> int:
+        """重新读取日线文件被修改的股票在date_range中已写入的日期,返回重新读取的文件数"""
+        date_range = [d for d in date_range if date2int(d) in self.row_of]
+        known = [i for i, symbol in enumerate(symbols) if symbol in self.column_of]
+        if len(date_range) == 0 or len(known) == 0:
+            return 0
+        self._fill(self.rows(date_range), self.columns([symbols[i] for i in known]),
+                   [paths[i] for i in known], date_range, workers)
+        self.data.flush()
+        return len(known)
+
+    def select(self, date_range: Sequence[datetime.date], symbols: Sequence[str]) -> np.ndarray:
+        """获取指定日期及股票的成交额,行对应日期,列对应股票,未写入的为nan"""
+        rows, columns = self.rows(date_range), self.columns(symbols)
+        rd = np.full((len(rows), len(columns)), np.nan, dtype=np.float32)
+        valid_rows, valid_columns = rows >= 0, columns >= 0
+        if valid_rows.any() and valid_columns.any():
+            rd[np.ix_(valid_rows, valid_columns)] = self.data[np.ix_(rows[valid_rows], columns[valid_columns])]
+        return rd
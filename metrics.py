@@ -0,0 +1,151 @@
+"""
+运行指标的统计,包括计时区间、计数器及耗时分布,运行结束后输出为json报告
+"""
+import sys
+import json
+import time
+import functools
+import threading
+import contextlib
+import numpy as np
+from typing import Dict, Iterable, List
+
+_lock = threading.Lock()
+counters: Dict[str, int] = {}
+histograms: Dict[str, List[float]] = {}
+_profile_engine = None  # 正在进行的性能剖析所用的工具
+_profile_results: list = []  # 其他线程的剖析结果,profile结束时合并
+_profile_local = threading.local()
+
+
+def reset():
+    """清空已统计的指标"""
+    with _lock:
+        counters.clear()
+        histograms.clear()
+
+
+def count(name, n=1):
+    """计数器加n"""
+    with _lock:
+        counters[name] = counters.get(name, 0) + n
+
+
+def observe(name, values: Iterable[float]):
+    """记录一组耗时(秒)"""
+    values = list(values)
+    with _lock:
+        histograms.setdefault(name, []).extend(values)
+
+
+@contextlib.contextmanager
+def span(name):
+    """统计代码块的耗时,记录在名为name的耗时分布中"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, [time.perf_counter() - start])
+
+
+def summary() -> Dict:
+    """汇总计数器及各耗时分布的次数、合计、均值、分位数及最大值"""
+    with _lock:
+        rd = {"counters": dict(counters), "histograms": {}}
+        items = {name: np.array(values) for name, values in histograms.items()}
+    for name, values in items.items():
+        rd["histograms"][name] = {
+            "count": len(values),
+            "total": float(values.sum()),
+            "mean": float(values.mean()),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+        }
+    return rd
+
+
+def write_report(path, **extra):
+    """将统计结果保存为json文件,extra为附加的运行信息"""
+    data = {**extra, **summary()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _start_profiler(engine):
+    if engine == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler(async_mode="disabled")
+        profiler.start()
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler, engine):
+    """停止剖析,返回可以合并的结果"""
+    if engine == "pyinstrument":
+        return profiler.stop()
+    profiler.disable()
+    return profiler
+
+
+def _thread_profiled(engine) -> bool:
+    """当前线程是否需要单独剖析,python3.12起cProfile基于sys.monitoring,已经覆盖所有线程"""
+    if engine is None or getattr(_profile_local, "active", False):
+        return False
+    return engine == "pyinstrument" or sys.version_info < (3, 12)
+
+
+def profiled(func):
+    """包装在线程池中执行的函数,profile进行中时单独剖析执行该函数的线程,结果合并到profile的输出中"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        engine = _profile_engine
+        if not _thread_profiled(engine):
+            return func(*args, **kwargs)
+        _profile_local.active = True
+        profiler = _start_profiler(engine)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            result = _stop_profiler(profiler, engine)
+            _profile_local.active = False
+            with _lock:
+                _profile_results.append(result)
+    return wrapper
+
+
+@contextlib.contextmanager
+def profile(path, engine="cprofile"):
+    """对代码块进行性能剖析,结果保存到path,经profiled包装的函数在其他线程中的调用一并合并
+
+    Args:
+        engine (str): cprofile保存为pstats文件,pyinstrument保存为html文件
+    """
+    global _profile_engine
+    _profile_results.clear()
+    _profile_local.active = True
+    _profile_engine = engine
+    profiler = _start_profiler(engine)
+    try:
+        yield
+    finally:
+        results = [_stop_profiler(profiler, engine)]
+        _profile_engine = None
+        _profile_local.active = False
+        with _lock:
+            results.extend(_profile_results)
+            _profile_results.clear()
+        if engine == "pyinstrument":
+            from pyinstrument.session import Session
+            from pyinstrument.renderers import HTMLRenderer
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(HTMLRenderer().render(functools.reduce(Session.combine, results)))
+        else:
+            import pstats
+            stats = pstats.Stats(results[0])
+            stats.add(*results[1:])
+            stats.dump_stats(path)
@@ -0,0 +1,102 @@
+"""
+期货开平仓的统计分析,将撮合结果转换为列式数据后整体计算
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable
+from qihuo_match import RoundTrip
+from qihuo_ingest import parse_trade_date
+
+# 各品种每点对应的金额(元)
+MULTIPLIERS = {"IF": 300, "IH": 300, "IC": 200, "IM": 200}
+HOLDING_BINS = [0, 60, 300, 900, 3600, 4 * 3600, 24 * 3600, 3 * 24 * 3600, np.inf]  # 持仓时间分组(秒)
+HOLDING_LABELS = ["1分钟内", "1-5分钟", "5-15分钟", "15分钟-1小时", "1-4小时", "4小时-1天", "1-3天", "3天以上"]
+COLUMNS = ["合约", "开仓日期", "开仓时间", "开仓方向", "开仓价", "开仓动作", "开仓手续费",
+           "平仓日期", "平仓时间", "平仓方向", "平仓价", "平仓动作", "平仓手续费", "手数", "每手盈亏点数"]
+
+
+def _to_datetime(dates: pd.Series, times: pd.Series) -> pd.Series:
+    """合并交易日期及成交时间"""
+    dates = parse_trade_date(dates).dt.strftime("%Y-%m-%d")
+    return pd.to_datetime(dates + " " + times.astype(str), format="mixed")
+
+
+class RoundTripColumns:
+    """逐个接收开平仓组合并按列记录,不保留RoundTrip对象,可以在流式写入报表的同一遍中收集"""
+
+    def __init__(self):
+        self.columns: Dict[str, list] = {name: [] for name in COLUMNS}
+
+    def add(self, round_trip: RoundTrip):
+        values = round_trip.open + round_trip.close[1:] + (round_trip.quantity, round_trip.profit)
+        for name, value in zip(COLUMNS, values):
+            self.columns[name].append(value)
+
+    def frame(self, multipliers: Dict[str, float] = None) -> pd.DataFrame:
+        """转换为round_trips_frame的结果"""
+        return _finish_frame(pd.DataFrame(self.columns, columns=COLUMNS), multipliers)
+
+
+def round_trips_frame(round_trips: Iterable[RoundTrip], multipliers: Dict[str, float] = None) -> pd.DataFrame:
+    """将开平仓组合转换为列式数据,盈亏及手续费单位为元,未知品种按每点1元计算"""
+    columns = RoundTripColumns()
+    for round_trip in round_trips:
+        columns.add(round_trip)
+    return columns.frame(multipliers)
+
+
+def _finish_frame(df: pd.DataFrame, multipliers: Dict[str, float] = None) -> pd.DataFrame:
+    """由按列记录的开平仓组合计算时刻、隔夜、盈亏及持仓时间"""
+    multipliers = MULTIPLIERS if multipliers is None else multipliers
+    if len(df) == 0:
+        return df
+    product = df["合约"].astype(str).str.extract(r"^([A-Za-z]+)", expand=False).str.upper()
+    multiplier = product.map(multipliers).fillna(1).to_numpy()
+    df["开仓时刻"] = _to_datetime(df["开仓日期"], df["开仓时间"])
+    df["平仓时刻"] = _to_datetime(df["平仓日期"], df["平仓时间"])
+    df["隔夜"] = df["开仓时刻"].dt.normalize() != df["平仓时刻"].dt.normalize()
+    df["毛盈亏"] = df["每手盈亏点数"].to_numpy() * df["手数"].to_numpy() * multiplier
+    df["手续费"] = (df["开仓手续费"].to_numpy() + df["平仓手续费"].to_numpy()) * df["手数"].to_numpy()
+    df["净盈亏"] = df["毛盈亏"] - df["手续费"]
+    df["持仓秒数"] = (df["平仓时刻"] - df["开仓时刻"]).dt.total_seconds()
+    return df.sort_values("平仓时刻", kind="stable", ignore_index=True)
+
+
+def _group_summary(df: pd.DataFrame, key) -> pd.DataFrame:
+    """按key分组统计手数、胜率、毛盈亏、手续费及净盈亏,胜率按扣除手续费前的盈亏计算"""
+    win_lots = df["手数"].where(df["毛盈亏"] > 0, 0)
+    grouped = df.assign(盈利手数=win_lots).groupby(key)
+    rd = grouped[["手数", "盈利手数", "毛盈亏", "手续费", "净盈亏"]].sum()
+    rd["胜率"] = rd["盈利手数"] / rd["手数"]
+    return rd
+
+
+def analyze(df: pd.DataFrame) -> Dict:
+    """统计净值曲线、最大回撤、按日/周/小时的盈亏、持仓时间分布、手续费占比及隔夜与日内的对比
+
+    Args:
+        df (pd.DataFrame): round_trips_frame的结果
+    """
+    if len(df) == 0:
+        return {}
+    equity = df["净盈亏"].cumsum()
+    drawdown = equity.cummax().clip(lower=0) - equity
+    close_time = df["平仓时刻"]
+    holding = pd.cut(df["持仓秒数"], HOLDING_BINS, labels=HOLDING_LABELS, right=False)
+    gross = df["毛盈亏"].sum()
+    fee = df["手续费"].sum()
+    return {
+        "净值曲线": pd.Series(equity.to_numpy(), index=close_time),
+        "最大回撤": float(drawdown.max()),
+        "最大回撤时刻": close_time.iloc[int(drawdown.to_numpy().argmax())],
+        "每日盈亏": _group_summary(df, close_time.dt.date.rename("日期")),
+        "每周盈亏": _group_summary(df, close_time.dt.to_period("W").rename("周")),
+        "每小时盈亏": _group_summary(df, close_time.dt.hour.rename("小时")),
+        "持仓时间分布": df.groupby(holding, observed=False)["手数"].sum(),
+        "持仓秒数统计": df["持仓秒数"].repeat(df["手数"]).describe(),
+        "手续费合计": float(fee),
+        "手续费占毛盈亏比例": float(fee / abs(gross)) if gross != 0 else float("nan"),
+        "每手手续费": float(fee / df["手数"].sum()),
+        "隔夜与日内": _group_summary(df, df["隔夜"].map({True: "隔夜", False: "日内"}).rename("类型")),
+        "合约": _group_summary(df, "合约"),
+    }
@@ -0,0 +1,113 @@
+"""
+期货结算单的读取,多进程解析Excel并按文件路径、大小及修改时间缓存解析结果
+"""
+import os
+import re
+import hashlib
+import pandas as pd
+from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+
+DATE_KEY = "_日期"  # 用于去重及排序的交易日期列
+
+
+def statement_date(file_name):
+    """从文件名中获取日报的交易日期,月报返回None"""
+    trade_date = re.search(r"\d{4}-\d{2}-\d{2}", file_name)
+    return None if trade_date is None else trade_date.group()
+
+
+def parse_trade_date(values: pd.Series) -> pd.Series:
+    """解析交易日期列,月报中为数值日期(例如20251013,合计行为空时读取为浮点数),日报为文件名中的日期"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    numeric = pd.to_numeric(values, errors="coerce")
+    text = values.astype(str).where(numeric.isna(), numeric.astype("Int64").astype(str))
+    compact = text.str.fullmatch(r"\d{8}")
+    rd = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    rd[compact] = pd.to_datetime(text[compact], format="%Y%m%d")
+    rd[~compact] = pd.to_datetime(text[~compact], format="ISO8601")
+    return rd
+
+
+def parse_statement(excel_path) -> pd.DataFrame:
+    """解析单个结算单的成交明细,日报的交易日期统一为文件名中的日期"""
+    df = pd.read_excel(excel_path, sheet_name="成交明细", header=9)
+    df = df.iloc[:-1]
+    trade_date = statement_date(os.path.basename(excel_path))
+    if trade_date is not None:
+        df = df.assign(交易日期=trade_date)
+    return df
+
+
+def _cache_path(cache_dir, excel_path):
+    name = hashlib.md5(os.path.abspath(excel_path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{name}.pkl")
+
+
+def _read_cache(cache_dir, excel_path):
+    """读取解析结果的缓存,文件大小或修改时间变化时返回None"""
+    path = _cache_path(cache_dir, excel_path)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(excel_path)
+    data = pd.read_pickle(path)
+    if data["size"] != stat.st_size or data["mtime"] != stat.st_mtime_ns:
+        return None
+    return data["df"]
+
+
+def _write_cache(cache_dir, excel_path, df: pd.DataFrame):
+    stat = os.stat(excel_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    pd.to_pickle({"size": stat.st_size, "mtime": stat.st_mtime_ns, "df": df}, _cache_path(cache_dir, excel_path))
+
+
+def load_statements(path, cache_dir, workers=1) -> pd.DataFrame:
+    """读取文件夹下所有结算单的成交明细,按交易日期排序
+
+    未缓存的文件在进程池中解析,月报已覆盖的交易日不再使用日报中的数据
+
+    Args:
+        path (str): 结算单所在的文件夹
+        cache_dir (str): 解析结果的缓存文件夹
+        workers (int): 解析Excel的进程数
+    """
+    file_names = sorted(name for name in os.listdir(path) if name.endswith((".xls", ".xlsx")))
+    frames: Dict[str, pd.DataFrame] = {}
+    missing: List[str] = []
+    for file_name in file_names:
+        kind = "交易明细日报" if statement_date(file_name) is not None else "成交明细月报"
+        print(f"当前文件为{kind}:{file_name}")
+        df = _read_cache(cache_dir, os.path.join(path, file_name))
+        if df is None:
+            missing.append(file_name)
+        else:
+            frames[file_name] = df
+    if len(missing) > 0:
+        print(f"解析{len(missing)}个未缓存的文件")
+        excel_paths = [os.path.join(path, file_name) for file_name in missing]
+        if workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = list(executor.map(parse_statement, excel_paths))
+        else:
+            parsed = [parse_statement(excel_path) for excel_path in excel_paths]
+        for file_name, excel_path, df in zip(missing, excel_paths, parsed):
+            _write_cache(cache_dir, excel_path, df)
+            frames[file_name] = df
+    # 同一交易日只使用一个文件的数据,月报优先于日报
+    covered = set()
+    kept = []
+    for file_name in sorted(file_names, key=lambda name: statement_date(name) is not None):
+        df = frames[file_name]
+        df = df.assign(**{DATE_KEY: parse_trade_date(df["交易日期"]).dt.date})
+        dates = set(df[DATE_KEY])
+        df = df[~df[DATE_KEY].isin(covered)]
+        covered |= dates
+        if len(df) > 0:
+            kept.append(df)
+    frames = kept
+    if len(frames) == 0:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values(DATE_KEY, kind="stable").drop(columns=DATE_KEY).reset_index(drop=True)
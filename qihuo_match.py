@@ -0,0 +1,95 @@
+"""
+期货成交的开平仓撮合,按合约记录(成交信息, 手数)的持仓,部分平仓时按手数拆分
+"""
+import collections
+import pandas as pd
+from typing import Deque, Dict, Iterator, List, NamedTuple, Tuple
+
+# 成交信息的字段,顺序与输出表格中的开仓、平仓操作一致
+FILL_FIELDS = ["合约", "交易日期", "成交时间", "买/卖", "成交价", "开/平", "手续费"]
+
+
+class RoundTrip(NamedTuple):
+    """一组开平仓,quantity手的开仓与平仓信息相同"""
+    open: tuple  # 开仓成交信息,字段见FILL_FIELDS,手续费为每手手续费
+    close: tuple  # 平仓成交信息
+    quantity: int
+    profit: float  # 每手盈亏点数
+
+    def row(self) -> list:
+        """输出表格中的一行:合约、开仓操作、平仓操作及盈亏"""
+        return list(self.open) + list(self.close[1:]) + [self.profit]
+
+    def rows(self) -> Iterator[list]:
+        """按每手一行展开"""
+        for _ in range(self.quantity):
+            yield self.row()
+
+
+class PositionBook:
+    """按合约撮合开平仓的持仓簿
+
+    与持仓方向相同的成交视为开仓,相反的成交按policy依次平掉持仓,平完后剩余的手数反向开仓
+
+    Args:
+        policy (str): lifo先平最近的开仓,fifo先平最早的开仓
+    """
+
+    def __init__(self, policy="lifo"):
+        if policy not in ("lifo", "fifo"):
+            raise ValueError(f"不支持的平仓顺序:{policy}")
+        self.policy = policy
+        self.positions: Dict[str, Deque[list]] = {}  # 合约 -> [成交信息, 剩余手数]
+
+    def fill(self, info: tuple, quantity: int) -> List[RoundTrip]:
+        """处理一笔成交,返回平仓形成的开平仓组合
+
+        Args:
+            info (tuple): 成交信息,字段见FILL_FIELDS
+            quantity (int): 成交手数
+        """
+        lots = self.positions.setdefault(info[0], collections.deque())
+        side, price = info[3], info[4]
+        rd = []
+        while quantity > 0 and len(lots) > 0 and lots[-1][0][3] != side:
+            lot = lots[-1] if self.policy == "lifo" else lots[0]
+            num = min(lot[1], quantity)
+            open_price = lot[0][4]
+            rd.append(RoundTrip(lot[0], info, num, open_price - price if side == "买" else price - open_price))
+            lot[1] -= num
+            quantity -= num
+            if lot[1] == 0:
+                if self.policy == "lifo":
+                    lots.pop()
+                else:
+                    lots.popleft()
+        if quantity > 0:
+            lots.append([info, quantity])
+        return rd
+
+    def open_positions(self) -> Dict[str, List[Tuple[tuple, int]]]:
+        """获取各合约未平仓的(成交信息, 手数)"""
+        return {key: [(lot[0], lot[1]) for lot in lots] for key, lots in self.positions.items() if len(lots) > 0}
+
+
+def match_frame(book: PositionBook, df: pd.DataFrame, trade_date=None) -> Iterator[RoundTrip]:
+    """按顺序撮合成交明细表中的所有成交
+
+    Args:
+        df (pd.DataFrame): 成交明细,包含合约、交易日期、成交时间、买/卖、成交价、开/平、手数、手续费
+        trade_date (str): 日报的交易日期,为None时使用表中的交易日期
+    """
+    if len(df) == 0:
+        return
+    num = df["手数"].astype(int)
+    columns = [
+        df["合约"],
+        df["交易日期"] if trade_date is None else pd.Series(trade_date, index=df.index),
+        df["成交时间"],
+        df["买/卖"].astype(str).str.strip(),
+        df["成交价"],
+        df["开/平"].astype(str).str.strip(),
+        df["手续费"] / num,
+    ]
+    for info, quantity in zip(zip(*[column.tolist() for column in columns]), num.tolist()):
+        yield from book.fill(info, quantity)
@@ -0,0 +1,111 @@
+"""
+流式输出期货成交的整理结果,边撮合边逐行写入Excel,并在同一遍中统计胜率及盈亏
+"""
+import xlsxwriter
+from typing import Dict, Iterable
+from qihuo_match import RoundTrip
+from qihuo_analytics import RoundTripColumns
+
+SUMMARY_KINDS = ["全部", "隔夜", "日内"]
+
+
+class Stats:
+    """开平仓的手数、盈利手数及盈亏点数合计"""
+
+    def __init__(self):
+        self.lots = 0
+        self.wins = 0
+        self.profit = 0.0
+
+    def add(self, round_trip: RoundTrip):
+        self.lots += round_trip.quantity
+        self.wins += round_trip.quantity if round_trip.profit > 0 else 0
+        self.profit += round_trip.profit * round_trip.quantity
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.lots if self.lots > 0 else float("nan")
+
+
+def write_header(wb: xlsxwriter.Workbook, ws):
+    """写入两行表头:合约、开仓操作、平仓操作及盈亏
+
+    constant_memory模式下写入第二行后第一行即被写出,不能再修改,
+    因此先写完第一行再写第二行,合约及盈亏只写在第一行,不跨两行合并
+    """
+    merge_format = wb.add_format({
+        'align': 'center',
+        'valign': 'vcenter',
+    })
+    ws.write(0, 0, "合约", merge_format)
+    ws.merge_range(0, 1, 0, 6, "开仓操作", merge_format)
+    ws.merge_range(0, 7, 0, 12, "平仓操作", merge_format)
+    ws.write(0, 13, "盈亏", merge_format)
+    ws.write_row(1, 1, ["交易日期", "成交时间", "买/卖", "成交价", "开/平", "手续费"])
+    ws.write_row(1, 7, ["交易日期", "成交时间", "买/卖", "成交价", "开/平", "手续费"])
+
+
+class ReportWriter:
+    """整理成交明细表的流式写入,使用xlsxwriter的constant_memory模式
+
+    第一个工作表为全部开平仓,之后每个合约一个工作表,关闭时写入汇总表;
+    写入的同时按列记录开平仓组合,供qihuo_analytics统计
+
+    Args:
+        path (str): 输出的Excel文件路径
+    """
+
+    def __init__(self, path):
+        self.wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.sheets = {}  # 工作表名称 -> [工作表, 下一行的行号]
+        self.stats: Dict[tuple, Stats] = {}  # (合约, 类型) -> 统计,合约为None表示全部合约
+        self.last_row = None
+        self.columns = RoundTripColumns()
+        self._sheet(None)
+
+    def _sheet(self, name):
+        if name not in self.sheets:
+            ws = self.wb.add_worksheet(name)
+            write_header(self.wb, ws)
+            self.sheets[name] = [ws, 2]
+        return self.sheets[name]
+
+    def write(self, round_trip: RoundTrip):
+        """写入一组开平仓,按每手一行展开"""
+        contract = round_trip.open[0]
+        row = round_trip.row()
+        for sheet in (self._sheet(None), self._sheet(contract)):
+            ws, row_i = sheet
+            for i in range(round_trip.quantity):
+                ws.write_row(row_i + i, 0, row)
+            sheet[1] += round_trip.quantity
+        kind = "日内" if round_trip.open[1] == round_trip.close[1] else "隔夜"
+        for key in ((None, "全部"), (None, kind), (contract, "全部"), (contract, kind)):
+            self.stats.setdefault(key, Stats()).add(round_trip)
+        self.columns.add(round_trip)
+        self.last_row = row
+
+    def write_all(self, round_trips: Iterable[RoundTrip]):
+        for round_trip in round_trips:
+            self.write(round_trip)
+
+    def summary(self, contract=None, kind="全部") -> Stats:
+        """获取统计结果,contract为None时为全部合约"""
+        return self.stats.get((contract, kind), Stats())
+
+    def close(self):
+        """写入汇总表并保存文件"""
+        ws = self.wb.add_worksheet("汇总")
+        ws.write_row(0, 0, ["合约", "类型", "手数", "盈利手数", "胜率", "盈亏"])
+        percent = self.wb.add_format({"num_format": "0.00%"})
+        row_i = 1
+        contracts = [None] + sorted(name for name in self.sheets if name is not None)
+        for contract in contracts:
+            for kind in SUMMARY_KINDS:
+                stats = self.summary(contract, kind)
+                ws.write_row(row_i, 0, ["全部" if contract is None else contract, kind, stats.lots, stats.wins])
+                if stats.lots > 0:
+                    ws.write_number(row_i, 4, stats.win_rate, percent)
+                ws.write_number(row_i, 5, stats.profit)
+                row_i += 1
+        self.wb.close()
@@ -0,0 +1,115 @@
+"""
+按依赖关系并发执行各个步骤的简单调度器
+"""
+import time
+import metrics
+from typing import Callable, Dict, List, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Stage:
+    """调度中的单个步骤
+
+    Args:
+        name (str): 步骤名称
+        func (Callable): 执行函数,参数依次为各依赖步骤的结果
+        deps (Sequence[str]): 依赖的步骤名称
+        inline (bool): 是否在调度线程中执行,例如matplotlib绘图等不宜放在子线程中的步骤
+    """
+
+    def __init__(self, name, func: Callable, deps: Sequence[str] = (), inline=False):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.inline = inline
+        self.start = None
+        self.end = None
+
+    @property
+    def elapsed(self) -> float:
+        return self.end - self.start
+
+
+class Scheduler:
+    """按依赖关系调度步骤,没有依赖关系的步骤在线程池中并发执行
+
+    Args:
+        workers (int): 线程池的线程数
+    """
+
+    def __init__(self, workers=8):
+        self.workers = workers
+        self.stages: Dict[str, Stage] = {}
+
+    def add(self, name, func: Callable, deps: Sequence[str] = (), inline=False):
+        """添加步骤,依赖的步骤需要先添加"""
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"步骤{name}依赖的步骤{dep}不存在")
+        self.stages[name] = Stage(name, func, deps, inline)
+
+    def _call(self, stage: Stage, results: Dict):
+        stage.start = time.perf_counter()
+        try:
+            return metrics.profiled(stage.func)(*[results[dep] for dep in stage.deps])
+        finally:
+            stage.end = time.perf_counter()
+            metrics.observe(f"stage.{stage.name}", [stage.elapsed])
+
+    def run(self) -> Dict:
+        """执行所有步骤,返回各步骤的结果,任一步骤出错时停止调度并抛出该错误"""
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        begin = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                ready = [stage for stage in pending.values() if all(dep in results for dep in stage.deps)]
+                for stage in ready:
+                    del pending[stage.name]
+                    if stage.inline:
+                        results[stage.name] = self._call(stage, results)
+                        print(f"完成步骤:{stage.name}, 耗时{stage.elapsed:.2f}秒")
+                    else:
+                        running[executor.submit(self._call, stage, results)] = stage
+                if any(stage.inline for stage in ready):
+                    continue
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        results[stage.name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    print(f"完成步骤:{stage.name}, 耗时{stage.elapsed:.2f}秒")
+        self.report(time.perf_counter() - begin)
+        return results
+
+    def critical_path(self) -> List[Stage]:
+        """获取总耗时最长的依赖链"""
+        longest: Dict[str, float] = {}
+        previous: Dict[str, str] = {}
+        for name, stage in self.stages.items():
+            longest[name] = stage.elapsed
+            if stage.deps:
+                dep = max(stage.deps, key=lambda item: longest[item])
+                longest[name] += longest[dep]
+                previous[name] = dep
+        name = max(longest, key=longest.get)
+        path = [self.stages[name]]
+        while name in previous:
+            name = previous[name]
+            path.insert(0, self.stages[name])
+        return path
+
+    def report(self, total: float):
+        """输出各步骤的耗时及关键路径"""
+        print(f"全部步骤耗时{total:.2f}秒,各步骤耗时:")
+        for stage in sorted(self.stages.values(), key=lambda item: item.start):
+            print(f"  {stage.name}: {stage.elapsed:.2f}秒")
+        path = self.critical_path()
+        print(f"关键路径({sum(stage.elapsed for stage in path):.2f}秒): {' -> '.join(stage.name for stage in path)}")
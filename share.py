@@ -0,0 +1,79 @@
+"""
+成交额占比的整体计算,所有板块的成交额组成日期×板块的二维数组,一次计算占比、涨幅、滚动Z值及分位
+"""
+import numpy as np
+import pandas as pd
+from typing import Sequence
+
+# 输出的统计项及列名后缀
+STATS = ["占比", "占比涨幅", "占比Z值", "占比分位"]
+
+
+def share_ratio(values: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """各板块成交额占总成交额的百分比,values为日期×板块,total为每日总成交额"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return values / np.asarray(total, dtype=np.float64)[:, None] * 100
+
+
+def pct_change(values: np.ndarray) -> np.ndarray:
+    """按日期的涨幅百分比,第一行为nan,与DataFrame.pct_change(fill_method=None)一致"""
+    rd = np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rd[1:] = (values[1:] / values[:-1] - 1) * 100
+    return rd
+
+
+def _windows(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动窗口视图,形状为(日期数-window+1, 板块数, window),不复制数据"""
+    return np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+
+
+def rolling_zscore(values: np.ndarray, window: int) -> np.ndarray:
+    """当前值相对最近window个值的Z值,窗口不足或含nan时为nan"""
+    rd = np.full(values.shape, np.nan)
+    if len(values) < window or window < 2:
+        return rd
+    windows = _windows(values, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rd[window - 1:] = (values[window - 1:] - windows.mean(axis=-1)) / windows.std(axis=-1, ddof=1)
+    return rd
+
+
+def rolling_percentile(values: np.ndarray, window: int) -> np.ndarray:
+    """当前值在最近window个值中的分位(百分比),相等的值按一半计入,窗口不足或含nan时为nan"""
+    rd = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return rd
+    windows = _windows(values, window)
+    current = values[window - 1:, :, None]
+    rank = (windows < current).sum(axis=-1) + ((windows == current).sum(axis=-1) - 1) / 2
+    rd[window - 1:] = np.where(np.isnan(windows).any(axis=-1), np.nan, rank / max(window - 1, 1) * 100)
+    return rd
+
+
+def share_frame(values: np.ndarray, total: np.ndarray, names: Sequence[str], index=None,
+                window=20, stats: Sequence[str] = STATS) -> pd.DataFrame:
+    """计算各板块的成交额占比统计,返回float32的DataFrame,列名为"{板块}_{统计项}",按板块排列
+
+    Args:
+        values (np.ndarray): 日期×板块的成交额
+        total (np.ndarray): 每日总成交额
+        names (Sequence[str]): 板块名称,与values的列对应
+        window (int): 滚动Z值及分位的窗口长度
+        stats (Sequence[str]): 需要输出的统计项,见STATS
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(len(total), len(names))
+    ratio = share_ratio(values, total)
+    funcs = {
+        "占比": lambda: ratio,
+        "占比涨幅": lambda: pct_change(ratio),
+        "占比Z值": lambda: rolling_zscore(ratio, window),
+        "占比分位": lambda: rolling_percentile(ratio, window),
+    }
+    for stat in stats:
+        if stat not in funcs:
+            raise ValueError(f"不支持的统计项:{stat}")
+    # 各统计项为日期×板块,堆叠为日期×板块×统计项后展开,列按板块分组
+    data = np.stack([funcs[stat]() for stat in stats], axis=-1).astype(np.float32)
+    columns = [f"{name}_{stat}" for name in names for stat in stats]
+    return pd.DataFrame(data.reshape(len(values), -1), index=index, columns=columns)
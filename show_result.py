@@ -1,11 +1,20 @@
+import os
+import html
+import hashlib
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime, timedelta
 
-# ==================== 1. 解决中文乱码问题 ====================
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+
+def _pyplot():
+    """
+    导入matplotlib.pyplot,只有输出png时才需要,html及svg不加载matplotlib
+    """
+    import matplotlib.pyplot as plt
+    # ==================== 1. 解决中文乱码问题 ====================
+    plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
 
 # ==================== 3. 定义条件着色函数 ====================
 def get_cell_color(row_idx):
@@ -45,61 +54,164 @@ def get_text_color(row_idx, col_idx, value, title_list, color_titles):
     return 'black'  # 默认黑色文字
 
 # ==================== 4. 创建表格图片 ====================
-def create_styled_table(df: pd.DataFrame, color_titles):
-    # 创建图形
-    _, ax = plt.subplots(figsize=(13, 5))
+HEADER_COLOR = '#4F81BD'  # 表头背景色
+ROW_COLORS = ('#F8F8F8', 'white')  # 奇数行、偶数行背景色
+
+
+def color_matrix(df: pd.DataFrame, color_titles):
+    """
+    由数值的正负一次性计算所有单元格的背景色及文字颜色,结果第0行为表头,与get_cell_color、get_text_color一致
+    """
+    rows, cols = df.shape
+    cell_colors = np.empty((rows + 1, cols), dtype=object)
+    cell_colors[0] = HEADER_COLOR
+    cell_colors[1::2] = ROW_COLORS[0]
+    cell_colors[2::2] = ROW_COLORS[1]
+    text_colors = np.full((rows + 1, cols), 'black', dtype=object)
+    text_colors[0] = 'white'
+    mask = np.asarray(df.columns.isin(list(color_titles)))
+    if mask.any():
+        values = df.loc[:, mask].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        body = text_colors[1:, mask]
+        body[values > 0] = 'red'    # 正数：红色文字
+        body[values < 0] = 'green'  # 负数：绿色文字
+        text_colors[1:, mask] = body
+    return cell_colors, text_colors
+
+
+def frame_hash(df: pd.DataFrame, *args) -> str:
+    """
+    表格内容及渲染参数的哈希,用于判断是否需要重新生成图片
+    """
+    h = hashlib.md5()
+    h.update(repr((df.columns.tolist(), df.shape, args)).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _render_png(cell_data, cell_colors, text_colors, title, output_filename):
+    """使用matplotlib绘制表格并保存为图片"""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(13, 5))
     ax.axis('tight')
     ax.axis('off')
-    
-    # 准备表格数据（包含表头）
-    cell_data = [df.columns.tolist()] + df.values.tolist()
-    titles = df.columns.tolist()
-    # 创建颜色矩阵
-    cell_colors = []
-    text_colors = []
-    
-    for i, row in enumerate(cell_data):
-        row_colors = []
-        row_text_colors = []
-        for j, value in enumerate(row):
-            row_colors.append(get_cell_color(i))
-            row_text_colors.append(get_text_color(i, j, value, titles, color_titles))
-        cell_colors.append(row_colors)
-        text_colors.append(row_text_colors)
-    
     # 创建表格
     table = ax.table(
         cellText=cell_data,
-        cellColours=cell_colors,
+        cellColours=cell_colors.tolist(),
         cellLoc='center',
         loc='center'
     )
-    
     # 设置表格样式
     table.auto_set_font_size(False)
     table.set_fontsize(10)
     table.scale(0.8, 2.0)
-    
-    # 设置文字颜色
-    for i in range(len(cell_data)):
-        for j in range(len(cell_data[0])):
-            table[(i, j)].get_text().set_color(text_colors[i][j])
-            if i == 0:  # 表头文字加粗
-                table[(i, j)].get_text().set_weight('bold')
-    
-    # 设置单元格边框
-    for _, cell in table.get_celld().items():
+    # 设置文字颜色及单元格边框,表头文字加粗
+    for (i, j), cell in table.get_celld().items():
+        cell.get_text().set_color(text_colors[i, j])
+        if i == 0:
+            cell.get_text().set_weight('bold')
         cell.set_edgecolor('gray')
         cell.set_linewidth(0.5)
-    
     # 添加标题
-    plt.title('市场情况分析图表', fontsize=16, pad=20, weight='bold')
-    
+    plt.title(title, fontsize=16, pad=20, weight='bold')
     # 调整布局并保存
     plt.tight_layout()
-    output_filename = 'test.png'
     plt.savefig(output_filename, dpi=300, bbox_inches='tight', facecolor='white')
-    
+    plt.close(fig)
+
+
+def _html(cell_data, cell_colors, text_colors, title) -> str:
+    """带内联样式的网页表格"""
+    lines = [
+        '<!DOCTYPE html>',
+        '<html><head><meta charset="utf-8"><title>%s</title></head><body>' % html.escape(title),
+        '<h2 style="text-align:center">%s</h2>' % html.escape(title),
+        '<table style="border-collapse:collapse;margin:auto;font-size:14px;text-align:center">',
+    ]
+    for i, row in enumerate(cell_data):
+        tag = 'th' if i == 0 else 'td'
+        cells = ''.join(
+            '<%s style="border:0.5px solid gray;padding:4px 8px;background:%s;color:%s">%s</%s>'
+            % (tag, cell_colors[i, j], text_colors[i, j], html.escape(str(value)), tag)
+            for j, value in enumerate(row)
+        )
+        lines.append('<tr>%s</tr>' % cells)
+    lines.append('</table></body></html>')
+    return '\n'.join(lines)
+
+
+def _render_html(cell_data, cell_colors, text_colors, title, output_filename):
+    """输出为网页表格,不需要绘图"""
+    with open(output_filename, 'w', encoding='utf-8') as f:
+        f.write(_html(cell_data, cell_colors, text_colors, title))
+
+
+def table_html(df: pd.DataFrame, color_titles, title='市场情况分析图表') -> str:
+    """
+    获取表格的网页内容,着色规则与create_styled_table一致
+    """
+    cell_colors, text_colors = color_matrix(df, color_titles)
+    return _html([df.columns.tolist()] + df.values.tolist(), cell_colors, text_colors, title)
+
+
+def _text_width(text, font_size):
+    """估算文字宽度,中文按两个字符计算"""
+    return sum(2 if ord(c) > 127 else 1 for c in text) * font_size * 0.55
+
+
+def _render_svg(cell_data, cell_colors, text_colors, title, output_filename, font_size=14, row_height=28):
+    """输出为矢量图,列宽按文字长度估算"""
+    texts = [[str(value) for value in row] for row in cell_data]
+    widths = [max(_text_width(row[j], font_size) for row in texts) + 16 for j in range(len(texts[0]))]
+    lefts = np.concatenate([[0], np.cumsum(widths)])
+    top = row_height * 1.5
+    width, height = lefts[-1], top + row_height * len(texts)
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="%.0f" height="%.0f" font-size="%d" '
+        'font-family="SimHei, Microsoft YaHei, sans-serif">' % (width, height, font_size),
+        '<text x="%.1f" y="%.1f" text-anchor="middle" font-size="%d" font-weight="bold">%s</text>'
+        % (width / 2, row_height, font_size + 4, html.escape(title)),
+    ]
+    for i, row in enumerate(texts):
+        y = top + i * row_height
+        weight = ' font-weight="bold"' if i == 0 else ''
+        for j, text in enumerate(row):
+            parts.append(
+                '<rect x="%.1f" y="%.1f" width="%.1f" height="%d" fill="%s" stroke="gray" stroke-width="0.5"/>'
+                '<text x="%.1f" y="%.1f" text-anchor="middle" dominant-baseline="central" fill="%s"%s>%s</text>'
+                % (lefts[j], y, widths[j], row_height, cell_colors[i, j],
+                   lefts[j] + widths[j] / 2, y + row_height / 2, text_colors[i, j], weight, html.escape(text))
+            )
+    parts.append('</svg>')
+    with open(output_filename, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+
+RENDERERS = {'.png': _render_png, '.html': _render_html, '.htm': _render_html, '.svg': _render_svg}
+
+
+def create_styled_table(df: pd.DataFrame, color_titles, output_filename='test.png', title='市场情况分析图表', force=False):
+    """
+    生成表格,输出格式由output_filename的扩展名决定,支持png、html及svg
+
+    表格内容的哈希保存在output_filename.hash中,内容未变化且文件已存在时不重新生成,force为True时总是重新生成
+    """
+    renderer = RENDERERS.get(os.path.splitext(output_filename)[1].lower())
+    if renderer is None:
+        raise ValueError(f"不支持的表格格式:{output_filename}")
+    hash_file = output_filename + '.hash'
+    digest = frame_hash(df, list(color_titles), title)
+    if not force and os.path.exists(output_filename) and os.path.exists(hash_file):
+        with open(hash_file, encoding='utf-8') as f:
+            if f.read().strip() == digest:
+                return output_filename
+    # 准备表格数据（包含表头）
+    cell_data = [df.columns.tolist()] + df.values.tolist()
+    cell_colors, text_colors = color_matrix(df, color_titles)
+    renderer(cell_data, cell_colors, text_colors, title, output_filename)
+    with open(hash_file, 'w', encoding='utf-8') as f:
+        f.write(digest)
     return output_filename
 
 # ==================== 5. 执行并显示结果 ====================
@@ -145,6 +257,6 @@ if __name__ == "__main__":
     
     # 显示图片（如果在支持图形界面的环境中）
     try:
-        plt.show()
+        _pyplot().show()
     except:
         print("\n提示: 在命令行环境中，图片已保存为文件，请查看生成的PNG文件")
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+按数据集、年份分区的parquet列式存储,替代按日期保存的csv缓存
+"""
+import os
+import re
+import pandas as pd
+from typing import Dict, Iterable
+
+DATE_COLUMN = "缓存日期"  # 存储中记录数据所属日期的列,格式例如20251011
+
+
+class ColumnStore:
+    """列式存储,每个数据集按年份保存为<root>/<name>/<YYYY>.parquet
+
+    Args:
+        root (str): 存储的根目录
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.partitions: Dict[tuple, pd.DataFrame] = {}  # 已读取的分区
+
+    def _path(self, name, year):
+        return os.path.join(self.root, name, f"{year}.parquet")
+
+    def _load(self, name, year) -> pd.DataFrame:
+        """读取单个年份的分区,不存在时返回空表"""
+        key = (name, year)
+        if key not in self.partitions:
+            path = self._path(name, year)
+            if os.path.exists(path):
+                self.partitions[key] = pd.read_parquet(path)
+            else:
+                self.partitions[key] = pd.DataFrame(columns=[DATE_COLUMN])
+        return self.partitions[key]
+
+    def read(self, name, date_str) -> pd.DataFrame:
+        """读取单日的数据,不存在时返回None"""
+        df = self._load(name, date_str[:4])
+        df = df[df[DATE_COLUMN] == date_str]
+        if len(df) == 0:
+            return None
+        return df.drop(columns=DATE_COLUMN).reset_index(drop=True)
+
+    def read_range(self, name, start, end) -> pd.DataFrame:
+        """一次读取[start, end]之间所有日期的数据,包含日期列DATE_COLUMN"""
+        frames = [self._load(name, str(year)) for year in range(int(start[:4]), int(end[:4]) + 1)]
+        df = pd.concat(frames, ignore_index=True)
+        return df[(df[DATE_COLUMN] >= start) & (df[DATE_COLUMN] <= end)].reset_index(drop=True)
+
+    def write(self, name, date_str, df: pd.DataFrame):
+        """保存单日的数据,覆盖该日已有的数据"""
+        self.write_many(name, {date_str: df})
+
+    def write_many(self, name, frames: Dict[str, pd.DataFrame]):
+        """批量保存多日的数据,每个年份分区只重写一次"""
+        years = {}
+        for date_str, df in frames.items():
+            years.setdefault(date_str[:4], []).append(df.assign(**{DATE_COLUMN: date_str}))
+        for year, new_frames in years.items():
+            df = self._load(name, year)
+            df = df[~df[DATE_COLUMN].isin(frames.keys())]
+            df = pd.concat(([df] if len(df) > 0 else []) + new_frames, ignore_index=True)
+            df = df.sort_values(DATE_COLUMN, kind="stable").reset_index(drop=True)
+            path = self._path(name, year)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.to_parquet(path + ".tmp", index=False)
+            os.replace(path + ".tmp", path)
+            self.partitions[(name, year)] = df
+
+
+def csv_dates(data_path) -> Iterable[str]:
+    """获取csv缓存目录下所有的日期文件夹"""
+    for date_str in sorted(os.listdir(data_path)):
+        if re.fullmatch(r"\d{8}", date_str) and os.path.isdir(os.path.join(data_path, date_str)):
+            yield date_str
+
+
+def migrate_csv(data_path, store: ColumnStore):
+    """将data_path/<日期>/<name>.csv的缓存导入列式存储,原csv文件保留不动"""
+    datasets: Dict[str, Dict[str, pd.DataFrame]] = {}
+    for date_str in csv_dates(data_path):
+        folder = os.path.join(data_path, date_str)
+        for file_name in os.listdir(folder):
+            if not file_name.endswith(".csv"):
+                continue
+            df = pd.read_csv(os.path.join(folder, file_name))
+            datasets.setdefault(file_name[:-4], {})[date_str] = df
+    for name, frames in datasets.items():
+        print(f"迁移缓存数据:{name}, 共{len(frames)}天")
+        store.write_many(name, frames)
@@ -0,0 +1,263 @@
+"""
+通达信本地日线文件的读取,直接将二进制记录解码为numpy结构化数组
+"""
+import os
+import time
+import struct
+import datetime
+import numpy as np
+import metrics
+from tqdm import tqdm
+from typing import Dict, List, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 标准市场日线(vipdoc/{sh,sz}/lday/*.day)的记录格式,每条32字节,价格为实际价格的100倍
+DAY_DTYPE = np.dtype([
+    ("date", "<u4"),
+    ("open", "<u4"),
+    ("high", "<u4"),
+    ("low", "<u4"),
+    ("close", "<u4"),
+    ("amount", "<f4"),
+    ("volume", "<u4"),
+    ("reserved", "<u4"),
+])
+
+# 扩展市场日线(vipdoc/ds/lday/*.day)的记录格式,amount即mootdx中的hk_stock_amount
+EXT_DAY_DTYPE = np.dtype([
+    ("date", "<u4"),
+    ("open", "<f4"),
+    ("high", "<f4"),
+    ("low", "<f4"),
+    ("close", "<f4"),
+    ("amount", "<f4"),
+    ("volume", "<u4"),
+    ("settlement", "<f4"),
+])
+
+# 分钟线(vipdoc/{sh,sz}/minline/*.lc1及fzline/*.lc5)的记录格式,每条32字节
+# date为(年-2004)*2048+月*100+日,minute为当日0点起的分钟数
+MINUTE_DTYPE = np.dtype([
+    ("date", "<u2"),
+    ("minute", "<u2"),
+    ("open", "<f4"),
+    ("high", "<f4"),
+    ("low", "<f4"),
+    ("close", "<f4"),
+    ("amount", "<f4"),
+    ("volume", "<u4"),
+    ("reserved", "<u4"),
+])
+MINUTE_FOLDERS = {1: ("minline", ".lc1"), 5: ("fzline", ".lc5")}  # 分钟数 -> (文件夹, 扩展名)
+
+def date2int(date: datetime.date) -> int:
+    """将日期转换为日线记录中的整数日期,例如20251013"""
+    return date.year * 10000 + date.month * 100 + date.day
+
+def dates2array(date_range: List[datetime.date]) -> np.ndarray:
+    """将日期列表转换为整数日期数组"""
+    return np.array([date2int(d) for d in date_range], dtype=np.uint32)
+
+def lday_folder(tdx_path, market) -> str:
+    """获取市场对应的日线文件夹,market为sh、sz或ds"""
+    return os.path.join(tdx_path, "vipdoc", market, "lday")
+
+def lday_snapshot(tdx_path, markets: Sequence[str] = ("sh", "sz", "ds")) -> Dict[str, tuple]:
+    """获取各市场日线文件夹中所有日线文件的(大小, 修改时间)"""
+    rd = {}
+    for market in markets:
+        folder = lday_folder(tdx_path, market)
+        if not os.path.exists(folder):
+            continue
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(".day"):
+                    stat = entry.stat()
+                    rd[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return rd
+
+def changed_files(old: Dict[str, tuple], new: Dict[str, tuple]) -> List[str]:
+    """新增或大小、修改时间发生变化的文件"""
+    return [path for path, stat in new.items() if old.get(path) != stat]
+
+def day_path(tdx_path, symbol) -> str:
+    """根据代码获取日线文件路径,市场判断规则与mootdx的Reader一致
+    
+    Args:
+        symbol (str): 代码,例如600000、sh600000、880823、62#000300
+    """
+    if "#" in symbol:
+        return os.path.join(lday_folder(tdx_path, "ds"), f"{symbol}.day")
+    symbol = symbol.lower()
+    if symbol.startswith(("sh", "sz", "bj")):
+        market, symbol = symbol[:2], symbol[2:]
+    elif symbol.startswith(("88", "5", "6", "7", "9")):
+        market = "sh"
+    elif symbol.startswith(("4", "8")):
+        market = "bj"
+    else:
+        market = "sz"
+    return os.path.join(lday_folder(tdx_path, market), f"{market}{symbol}.day")
+
+def read_day(path, dtype=DAY_DTYPE) -> np.ndarray:
+    """读取单个日线文件的全部记录,忽略文件末尾不完整的记录"""
+    count = os.path.getsize(path) // dtype.itemsize
+    with open(path, "rb") as f:
+        return np.fromfile(f, dtype=dtype, count=count)
+
+def last_date(path, dtype=DAY_DTYPE) -> int:
+    """读取日线文件最后一条记录的日期,没有记录时返回0"""
+    count = os.path.getsize(path) // dtype.itemsize
+    if count == 0:
+        return 0
+    with open(path, "rb") as f:
+        f.seek((count - 1) * dtype.itemsize)
+        return struct.unpack("<I", f.read(4))[0]
+
+def _search_date(f, itemsize, lo, hi, date, fmt="<I") -> int:
+    """在[lo, hi)范围内二分查找第一条日期不小于date的记录序号,fmt为记录开头日期字段的格式"""
+    size = struct.calcsize(fmt)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(mid * itemsize)
+        if struct.unpack(fmt, f.read(size))[0] < date:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def read_day_range(path, start: int, end: int, dtype=DAY_DTYPE) -> np.ndarray:
+    """只读取日期在[start, end]之间的记录,start和end为整数日期
+    
+    日线记录定长且按日期升序排列,先定位首尾记录再一次性读取中间部分
+    """
+    itemsize = dtype.itemsize
+    count = os.path.getsize(path) // itemsize
+    with open(path, "rb") as f:
+        first = _search_date(f, itemsize, 0, count, start)
+        # 查询区间通常包含最新交易日,此时无需再查找结束位置
+        last = count
+        if first < count:
+            f.seek((count - 1) * itemsize)
+            if struct.unpack("<I", f.read(4))[0] > end:
+                last = _search_date(f, itemsize, first, count, end + 1)
+        f.seek(first * itemsize)
+        return np.fromfile(f, dtype=dtype, count=last - first)
+
+def fill_amount(out: np.ndarray, records: np.ndarray, dates: np.ndarray):
+    """将记录中对应日期的成交额写入out,没有记录的日期保持不变"""
+    if len(records) == 0:
+        return
+    index = np.searchsorted(records["date"], dates)
+    index[index == len(records)] = len(records) - 1
+    hit = records["date"][index] == dates
+    out[hit] = records["amount"][index[hit]]
+
+def _amount_chunk(paths: Sequence[str], dates: np.ndarray, dtype=DAY_DTYPE):
+    """读取一批日线文件的成交额,供子进程调用
+
+    Returns:
+        (float32成交额矩阵, 每个文件的读取耗时)
+    """
+    start, end = int(dates.min()), int(dates.max())
+    rd = np.full((len(paths), len(dates)), np.nan, dtype=np.float32)
+    elapsed = np.zeros(len(paths))
+    for i, path in enumerate(paths):
+        begin = time.perf_counter()
+        records = read_day_range(path, start, end, dtype)
+        elapsed[i] = time.perf_counter() - begin
+        fill_amount(rd[i], records, dates)
+    return rd, elapsed
+
+def scan_amount(paths: Sequence[str], date_range: List[datetime.date], workers=1, chunksize=256, dtype=DAY_DTYPE):
+    """分片读取日线文件的成交额,逐片返回(首个文件的序号, float32成交额矩阵)
+
+    Args:
+        workers (int): 进程数,大于1时将分片交给进程池读取,分片按完成顺序返回
+        chunksize (int): 每个分片包含的文件数,文件数不超过一个分片时不显示进度条
+    """
+    dates = dates2array(date_range)
+    shards = range(0, len(paths), chunksize)
+    with tqdm(total=len(paths), disable=len(paths) <= chunksize) as bar:
+        if workers <= 1 or len(paths) <= chunksize:
+            for i in shards:
+                chunk, elapsed = _amount_chunk(paths[i:i + chunksize], dates, dtype)
+                metrics.observe("tdx.read_day", elapsed)
+                bar.update(len(chunk))
+                yield i, chunk
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_amount_chunk, paths[i:i + chunksize], dates, dtype): i for i in shards}
+            for future in as_completed(futures):
+                chunk, elapsed = future.result()
+                metrics.observe("tdx.read_day", elapsed)
+                bar.update(len(chunk))
+                yield futures[future], chunk
+
+def amount_matrix(paths: Sequence[str], date_range: List[datetime.date], workers=1, chunksize=256,
+                  dtype=DAY_DTYPE) -> np.ndarray:
+    """获取多个日线文件在指定日期的成交额矩阵,行对应文件,列对应日期,缺失值为nan"""
+    rd = np.full((len(paths), len(date_range)), np.nan)
+    for i, chunk in scan_amount(paths, date_range, workers, chunksize, dtype):
+        rd[i:i + len(chunk)] = chunk
+    return rd
+
+def is_ext(symbol) -> bool:
+    """代码是否属于扩展市场,例如62#000300"""
+    return "#" in symbol
+
+def board_amount(tdx_path, symbols: Sequence[str], date_range: List[datetime.date], workers=1) -> np.ndarray:
+    """一次读取多个板块、指数的成交额,返回行对应日期、列对应代码的矩阵,缺失值为nan
+
+    标准市场与扩展市场的代码分别按各自的记录格式批量读取,日线文件不存在时整列为nan
+    """
+    rd = np.full((len(date_range), len(symbols)), np.nan)
+    for ext, dtype in ((False, DAY_DTYPE), (True, EXT_DAY_DTYPE)):
+        columns = [i for i, symbol in enumerate(symbols) if is_ext(symbol) == ext]
+        paths = [day_path(tdx_path, symbols[i]) for i in columns]
+        columns = [i for i, path in zip(columns, paths) if os.path.exists(path)]
+        paths = [path for path in paths if os.path.exists(path)]
+        if len(paths) > 0:
+            rd[:, columns] = amount_matrix(paths, date_range, workers, dtype=dtype).T
+    return rd
+
+def minute_date(date: datetime.date) -> int:
+    """将日期转换为分钟线记录中的日期"""
+    return (date.year - 2004) * 2048 + date.month * 100 + date.day
+
+def decode_minute_date(values: np.ndarray) -> np.ndarray:
+    """将分钟线记录中的日期转换为整数日期,例如20251013"""
+    values = values.astype(np.uint32)
+    return (values // 2048 + 2004) * 10000 + values % 2048
+
+def minute_path(tdx_path, market, code, freq=1) -> str:
+    """获取分钟线文件路径
+
+    Args:
+        market (str): 市场目录,sh、sz或bj
+        code (str): 6位代码
+        freq (int): 1为1分钟线,5为5分钟线
+    """
+    folder, ext = MINUTE_FOLDERS[freq]
+    return os.path.join(tdx_path, "vipdoc", market, folder, f"{market}{code}{ext}")
+
+def read_minute_from(path, offset: int, date: datetime.date):
+    """读取分钟线文件中offset字节之后新追加的完整记录,用于盘中增量读取
+
+    offset小于0时先二分查找date当天的第一条记录;文件不存在时不读取
+
+    Returns:
+        (记录, 下次读取的字节偏移)
+    """
+    itemsize = MINUTE_DTYPE.itemsize
+    if not os.path.exists(path):
+        return np.zeros(0, dtype=MINUTE_DTYPE), offset
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if offset < 0:
+            offset = _search_date(f, itemsize, 0, size // itemsize, minute_date(date), "<H") * itemsize
+        count = (size - offset) // itemsize
+        if count <= 0:
+            return np.zeros(0, dtype=MINUTE_DTYPE), offset
+        f.seek(offset)
+        return np.fromfile(f, dtype=MINUTE_DTYPE, count=count), offset + count * itemsize
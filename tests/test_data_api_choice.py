@@ -0,0 +1,113 @@
+import json
+import datetime
+import threading
+import collections
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("akshare")
+import requests  # noqa: E402
+import data_api_choice  # noqa: E402
+
+DATES = [datetime.date(2025, 10, 13) + datetime.timedelta(days=i) for i in range(5)]
+
+
+class StubServer:
+    """本地模拟的东方财富日K线接口,statuses为各代码依次返回的错误状态码"""
+
+    def __init__(self, klines, statuses=None):
+        self.klines = klines
+        self.statuses = {code: list(values) for code, values in (statuses or {}).items()}
+        self.requests = collections.Counter()
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                code = parse_qs(urlparse(self.path).query)["secid"][0].split(".")[1]
+                with stub.lock:
+                    stub.requests[code] += 1
+                    status = stub.statuses.get(code, [None]).pop(0) if stub.statuses.get(code) else None
+                if status is not None:
+                    self.send_response(status)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                lines = [f"{day},1,1,1,1,100,{amount},0,0,0,0" for day, amount in stub.klines.get(code, {}).items()]
+                body = json.dumps({"data": {"code": code, "klines": lines}}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/qt/stock/kline/get"
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    servers = []
+
+    def start(spot_lists, klines, statuses=None):
+        server = StubServer(klines, statuses)
+        servers.append(server)
+        monkeypatch.setattr(data_api_choice, "hist_url", server.url)
+        monkeypatch.setattr(data_api_choice, "fetch_rate", 1000.0)
+        for name, codes in zip(("stock_sh_a_spot_em", "stock_sz_a_spot_em", "stock_cy_a_spot_em",
+                                "stock_kc_a_spot_em"), spot_lists):
+            monkeypatch.setattr(data_api_choice.ak, name, lambda codes=codes: pd.DataFrame({"代码": codes}),
+                                raising=False)
+        return server
+
+    yield start
+    for server in servers:
+        server.server.shutdown()
+
+
+def reference(klines, codes, n):
+    """按日期逐一排序取前n名的合计"""
+    rd = []
+    for day in DATES:
+        key = day.strftime("%Y-%m-%d")
+        rd.append(sum(sorted(klines.get(code, {}).get(key, 0.0) for code in codes)[-n:]))
+    return rd
+
+
+def test_top_n_matches_sorted_reference(stub):
+    rng = np.random.default_rng(0)
+    sh = [f"{600000 + i}" for i in range(30)]
+    sz = [f"{i:06d}" for i in range(1, 20)] + [f"{300000 + i}" for i in range(3)]
+    cy = [f"{300000 + i}" for i in range(10)]  # 创业板代码同时出现在深证A股列表中
+    kc = [f"{688000 + i}" for i in range(5)]
+    codes = list(dict.fromkeys(sh + sz + cy + kc))
+    # 每只股票随机缺少部分日期,并带有date_range之外的日期
+    days = [DATES[0] - datetime.timedelta(days=1)] + DATES + [DATES[-1] + datetime.timedelta(days=1)]
+    klines = {code: {day.strftime("%Y-%m-%d"): float(rng.integers(1, 10 ** 6)) for day in days if rng.random() > 0.2}
+              for code in codes}
+    server = stub([sh, sz, cy, kc], klines, statuses={"600003": [500]})
+    rd = data_api_choice.get_top20_summary(DATES, n=20)
+    assert rd == pytest.approx(reference(klines, codes, 20))
+    # 重复的代码只请求一次,出错的代码重试后成功
+    assert server.requests["600003"] == 2
+    assert all(server.requests[code] == 1 for code in codes if code != "600003")
+
+
+def test_fewer_symbols_than_n(stub):
+    klines = {"600000": {"2025-10-13": 1.0, "2025-10-14": 2.0}, "000001": {"2025-10-14": 3.0}}
+    stub([["600000"], ["000001"], [], []], klines)
+    assert data_api_choice.get_top20_summary(DATES, n=20) == [1.0, 5.0, 0.0, 0.0, 0.0]
+
+
+def test_client_error_is_not_retried(stub):
+    server = stub([["600000"], [], [], []], {}, statuses={"600000": [404]})
+    with pytest.raises(requests.exceptions.HTTPError) as info:
+        data_api_choice.get_top20_summary(DATES)
+    assert not isinstance(info.value, data_api_choice.RetryableHTTPError)
+    assert server.requests["600000"] == 1
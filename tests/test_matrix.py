@@ -0,0 +1,108 @@
+import datetime
+import struct
+import numpy as np
+from matrix import AmountMatrix
+
+DAYS = [datetime.date(2025, 10, 13) + datetime.timedelta(days=i) for i in range(10)]
+
+
+def write_day(path, days, amounts):
+    """按<IIIIIfII写入通达信日线记录"""
+    with open(path, "wb") as f:
+        for day, amount in zip(days, amounts):
+            date = day.year * 10000 + day.month * 100 + day.day
+            f.write(struct.pack("<IIIIIfII", date, 100, 110, 90, 105, amount, 1000, 0))
+
+
+def make_files(tmp_path, count, days=DAYS, scale=1.0):
+    symbols, paths = [], []
+    for i in range(count):
+        symbol = f"6000{i:02d}"
+        path = tmp_path / f"sh{symbol}.day"
+        # 第i只股票从第i个交易日开始有数据
+        write_day(path, days[i:], [scale * (i + 1) * 1000 + k for k in range(len(days) - i)])
+        symbols.append(symbol)
+        paths.append(str(path))
+    return symbols, paths
+
+
+def expected(symbols, date_range, days=DAYS, scale=1.0):
+    rd = np.full((len(date_range), len(symbols)), np.nan, dtype=np.float32)
+    for j, symbol in enumerate(symbols):
+        i = int(symbol[-2:])
+        for r, day in enumerate(date_range):
+            if day in days[i:]:
+                rd[r, j] = scale * (i + 1) * 1000 + days.index(day) - i
+    return rd
+
+
+def test_update_appends_dates_and_symbols(tmp_path):
+    symbols, paths = make_files(tmp_path, 5)
+    root = str(tmp_path / "matrix")
+    matrix = AmountMatrix(root)
+    assert matrix.update(symbols[:3], paths[:3], DAYS[:4]) == DAYS[:4]
+    np.testing.assert_array_equal(matrix.select(DAYS[:4], symbols[:3]), expected(symbols[:3], DAYS[:4]))
+    # 新上市的股票补齐已有日期,新日期读取全部股票,最新一个已写入的日期重新读取
+    assert matrix.update(symbols, paths, DAYS[2:8]) == DAYS[3:8]
+    np.testing.assert_array_equal(matrix.select(DAYS[:8], symbols), expected(symbols, DAYS[:8]))
+    assert matrix.view().shape == (8, 5)
+    # 重新打开后数据与索引一致,未写入的日期及股票为nan
+    reopened = AmountMatrix(root)
+    assert reopened.dates.tolist() == [d.year * 10000 + d.month * 100 + d.day for d in DAYS[:8]]
+    want = np.full((len(DAYS), 6), np.nan, dtype=np.float32)
+    want[:8, :5] = expected(symbols, DAYS[:8])
+    np.testing.assert_array_equal(reopened.select(DAYS, symbols + ["000001"]), want)
+
+
+def test_update_without_refresh_latest(tmp_path):
+    symbols, paths = make_files(tmp_path, 3)
+    matrix = AmountMatrix(str(tmp_path / "matrix"))
+    matrix.update(symbols, paths, DAYS[:3])
+    assert matrix.update(symbols, paths, DAYS[:3], refresh_latest=False) == []
+
+
+def test_refresh_rereads_written_dates(tmp_path):
+    symbols, paths = make_files(tmp_path, 4)
+    matrix = AmountMatrix(str(tmp_path / "matrix"))
+    matrix.update(symbols, paths, DAYS[:6])
+    # 日线文件被重写后只重新读取指定的股票,未写入的日期及股票忽略
+    make_files(tmp_path, 4, scale=2.0)
+    assert matrix.refresh(symbols[1:3] + ["000001"], paths[1:3] + [paths[0]], DAYS[4:]) == 2
+    want = expected(symbols, DAYS[:6])
+    want[4:6, 1:3] = expected(symbols[1:3], DAYS[4:6], scale=2.0)
+    np.testing.assert_array_equal(matrix.select(DAYS[:6], symbols), want)
+    assert len(matrix.dates) == 6
+    assert matrix.refresh(symbols, paths, DAYS[6:]) == 0
+
+
+def test_update_rereads_only_modified_files(tmp_path):
+    symbols, paths = make_files(tmp_path, 4)
+    matrix = AmountMatrix(str(tmp_path / "matrix"))
+    snapshot = {path: (1, 1) for path in paths}
+    matrix.update(symbols, paths, DAYS[:6], stats=snapshot)
+    # 快照随索引保存,重新打开后未修改的文件不再读取
+    matrix = AmountMatrix(str(tmp_path / "matrix"))
+    assert matrix.stats == snapshot
+    write_day(paths[2], DAYS[2:6], [1, 2, 3, 4])
+    write_day(paths[3], DAYS[3:6], [5, 6, 7])
+    snapshot = dict(snapshot, **{paths[2]: (2, 2)})
+    assert matrix.update(symbols, paths, DAYS[:6], stats=snapshot) == []
+    want = expected(symbols, DAYS[:6])
+    want[5, 2] = 4
+    np.testing.assert_array_equal(matrix.select(DAYS[:6], symbols), want)
+    assert AmountMatrix(str(tmp_path / "matrix")).stats == snapshot
+
+
+def test_row_chunks_are_sorted_views(tmp_path):
+    symbols, paths = make_files(tmp_path, 3)
+    matrix = AmountMatrix(str(tmp_path / "matrix"))
+    matrix.update(symbols, paths, DAYS[4:8])
+    # 补齐更早的日期后行仍按日期排序
+    assert matrix.update(symbols, paths, DAYS[:6]) == DAYS[:4]
+    assert matrix.dates.tolist() == sorted(matrix.dates.tolist())
+    date_range = DAYS[:3] + [datetime.date(2020, 1, 1)] + DAYS[3:8]
+    chunks = list(matrix.row_chunks(date_range, rows=4))
+    assert [positions.tolist() for positions, _ in chunks] == [[0, 1, 2], [4, 5, 6, 7], [8]]
+    for positions, block in chunks:
+        assert np.shares_memory(block, matrix.view())
+        np.testing.assert_array_equal(block, expected(symbols, [date_range[i] for i in positions]))
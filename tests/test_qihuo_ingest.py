@@ -0,0 +1,57 @@
+import datetime
+import numpy as np
+import pandas as pd
+from qihuo_ingest import load_statements, parse_trade_date
+from qihuo_match import PositionBook, match_frame
+from qihuo_analytics import round_trips_frame
+
+
+def write_statement(path, fills: pd.DataFrame):
+    """按结算单的格式写入成交明细:9行表头说明,之后为列名、成交记录及合计行"""
+    total = {"合约": "合计", "手数": fills["手数"].sum(), "手续费": fills["手续费"].sum()}
+    df = pd.concat([fills, pd.DataFrame([total])], ignore_index=True)
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        df.to_excel(writer, sheet_name="成交明细", startrow=9, index=False)
+        sheet = writer.sheets["成交明细"]
+        for i in range(9):
+            sheet.write(i, 0, f"说明{i}")
+
+
+def fills(dates, prices, sides):
+    n = len(prices)
+    return pd.DataFrame({
+        "交易日期": dates,
+        "合约": ["IM2412"] * n,
+        "成交时间": [f"10:{i:02d}:00" for i in range(n)],
+        "买/卖": sides,
+        "成交价": prices,
+        "开/平": ["开" if side == "买" else "平" for side in sides],
+        "手数": [1] * n,
+        "手续费": [2.0] * n,
+    })
+
+
+def test_parse_trade_date_layouts():
+    expected = [pd.Timestamp(2025, 10, 13), pd.Timestamp(2025, 10, 14)]
+    assert parse_trade_date(pd.Series([20251013.0, 20251014.0])).tolist() == expected
+    assert parse_trade_date(pd.Series([20251013, 20251014])).tolist() == expected
+    assert parse_trade_date(pd.Series(["2025-10-13", "20251014"])).tolist() == expected
+
+
+def test_monthly_numeric_and_daily_statements(tmp_path):
+    folder = tmp_path / "期货成交明细"
+    folder.mkdir()
+    # 月报的交易日期为数值,合计行使该列读取为浮点数
+    write_statement(folder / "月报202510.xlsx", fills([20251013, 20251013, 20251014], [100.0, 110.0, 120.0],
+                                                      ["买", "卖", "买"]))
+    # 日报的交易日期为文件名中的日期,其中10月14日已被月报覆盖
+    write_statement(folder / "日报2025-10-14.xlsx", fills([np.nan], [999.0], ["卖"]))
+    write_statement(folder / "日报2025-10-15.xlsx", fills([np.nan], [130.0], ["卖"]))
+    df = load_statements(str(folder), str(tmp_path / "cache"))
+    assert df["成交价"].tolist() == [100.0, 110.0, 120.0, 130.0]
+    assert parse_trade_date(df["交易日期"]).dt.date.tolist() == [
+        datetime.date(2025, 10, 13), datetime.date(2025, 10, 13), datetime.date(2025, 10, 14),
+        datetime.date(2025, 10, 15)]
+    trips = round_trips_frame(match_frame(PositionBook(), df))
+    assert trips["隔夜"].tolist() == [False, True]
+    assert trips["每手盈亏点数"].tolist() == [10.0, 10.0]
@@ -0,0 +1,73 @@
+import random
+import collections
+import pandas as pd
+import pytest
+from qihuo_match import PositionBook, match_frame
+
+
+def per_lot_reference(df: pd.DataFrame, policy: str) -> list:
+    """原来按每手逐一撮合的实现,持仓按合约区分,作为按手数撮合的参照"""
+    output_data = []
+    positions = {}
+    for _, row in df.iterrows():
+        num = row["手数"]
+        each_trade_type = str.strip(row["买/卖"])
+        each_data = [row["合约"], row["交易日期"], row["成交时间"], each_trade_type, row["成交价"],
+                     str.strip(row["开/平"]), row["手续费"] / num]
+        open_position_list = positions.setdefault(row["合约"], collections.deque())
+        for _ in range(num):
+            if len(open_position_list) == 0 or open_position_list[-1][3] == each_trade_type:
+                open_position_list.append(each_data.copy())
+            else:
+                each_full_data = open_position_list.pop() if policy == "lifo" else open_position_list.popleft()
+                each_full_data.extend(each_data[1:])
+                each_full_data.append(each_full_data[4] - row["成交价"] if each_trade_type == "买"
+                                      else row["成交价"] - each_full_data[4])
+                output_data.append(each_full_data)
+    return output_data
+
+
+def random_fills(rng: random.Random, n: int) -> pd.DataFrame:
+    """随机生成成交明细,手数较大时会出现部分平仓及平仓后反向开仓"""
+    return pd.DataFrame({
+        "合约": [rng.choice(["IM2412", "IC2412"]) for _ in range(n)],
+        "交易日期": [f"2024-12-{rng.randint(1, 28):02d}" for _ in range(n)],
+        "成交时间": [f"10:{i // 60:02d}:{i % 60:02d}" for i in range(n)],
+        "买/卖": [rng.choice([" 买", "卖 "]) for _ in range(n)],
+        "成交价": [float(rng.randint(5000, 6000)) for _ in range(n)],
+        "开/平": ["开"] * n,
+        "手数": [rng.randint(1, 6) for _ in range(n)],
+        "手续费": [rng.randint(1, 50) * 1.0 for _ in range(n)],
+    })
+
+
+@pytest.mark.parametrize("policy", ["lifo", "fifo"])
+def test_matches_per_lot_reference(policy):
+    rng = random.Random(1)
+    for _ in range(200):
+        df = random_fills(rng, rng.randint(1, 40))
+        book = PositionBook(policy)
+        rows = [row for trip in match_frame(book, df) for row in trip.rows()]
+        assert rows == per_lot_reference(df, policy)
+
+
+@pytest.mark.parametrize("policy, expected", [
+    # 开多3手后平2手,剩余1手;再开多1手后卖出3手,平掉2手并反向开空1手
+    ("lifo", [(100.0, 2, 10.0), (130.0, 1, 20.0), (100.0, 1, 50.0)]),
+    ("fifo", [(100.0, 2, 10.0), (100.0, 1, 50.0), (130.0, 1, 20.0)]),
+])
+def test_partial_close(policy, expected):
+    df = pd.DataFrame({
+        "合约": ["IM2412"] * 4,
+        "交易日期": ["2024-12-02"] * 4,
+        "成交时间": ["09:30:00", "09:31:00", "09:32:00", "09:33:00"],
+        "买/卖": ["买", "卖", "买", "卖"],
+        "成交价": [100.0, 110.0, 130.0, 150.0],
+        "开/平": ["开", "平", "开", "平"],
+        "手数": [3, 2, 1, 3],
+        "手续费": [3.0, 2.0, 1.0, 3.0],
+    })
+    book = PositionBook(policy)
+    trips = list(match_frame(book, df))
+    assert [(trip.open[4], trip.quantity, trip.profit) for trip in trips] == expected
+    assert book.open_positions() == {"IM2412": [(trips[-1].close, 1)]}
@@ -0,0 +1,37 @@
+import openpyxl
+import pandas as pd
+from qihuo_match import RoundTrip
+from qihuo_report import ReportWriter
+from qihuo_analytics import round_trips_frame
+
+OPEN = ("IM2412", "2024-12-02", "09:30:00", "买", 5000.0, "开", 1.0)
+CLOSE = ("IM2412", "2024-12-03", "10:00:00", "卖", 5010.0, "平", 1.0)
+FILL_COLUMNS = ["交易日期", "成交时间", "买/卖", "成交价", "开/平", "手续费"]
+
+
+def test_header_and_rows(tmp_path):
+    path = tmp_path / "整理成交明细.xlsx"
+    writer = ReportWriter(str(path))
+    writer.write_all([RoundTrip(OPEN, CLOSE, 2, 10.0)])
+    writer.close()
+    wb = openpyxl.load_workbook(path)
+    assert wb.sheetnames == ["Sheet1", "IM2412", "汇总"]
+    for name in ("Sheet1", "IM2412"):
+        ws = wb[name]
+        rows = list(ws.iter_rows(values_only=True))
+        assert rows[0] == ("合约", "开仓操作") + (None,) * 5 + ("平仓操作",) + (None,) * 5 + ("盈亏",)
+        assert rows[1] == (None,) + tuple(FILL_COLUMNS) * 2 + (None,)
+        assert rows[2:] == [OPEN + CLOSE[1:] + (10.0,)] * 2
+        assert sorted(str(cells) for cells in ws.merged_cells.ranges) == ["B1:G1", "H1:M1"]
+    summary = list(wb["汇总"].iter_rows(values_only=True))
+    assert summary[0] == ("合约", "类型", "手数", "盈利手数", "胜率", "盈亏")
+    assert summary[1] == ("全部", "全部", 2, 2, 1, 20)
+
+
+def test_columns_match_round_trips_frame(tmp_path):
+    trips = [RoundTrip(OPEN, CLOSE, 2, 10.0),
+             RoundTrip(("IC2412",) + OPEN[1:], ("IC2412",) + CLOSE[1:], 1, -4.0)]
+    writer = ReportWriter(str(tmp_path / "整理成交明细.xlsx"))
+    writer.write_all(iter(trips))
+    writer.close()
+    pd.testing.assert_frame_equal(writer.columns.frame(), round_trips_frame(trips))
@@ -0,0 +1,30 @@
+import os
+import sys
+import subprocess
+import pandas as pd
+from show_result import color_matrix, get_cell_color, get_text_color
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_color_matrix_matches_cell_functions():
+    df = pd.DataFrame({"日期": ["2025-10-13", "2025-10-14", "2025-10-15"], "占比": [1.5, -2.0, 0.0],
+                       "占比涨幅": [-0.3, 0.2, float("nan")]})
+    cell_colors, text_colors = color_matrix(df, ["占比涨幅"])
+    rows = [df.columns.tolist()] + df.values.tolist()
+    for i, row in enumerate(rows):
+        for j, value in enumerate(row):
+            assert cell_colors[i, j] == get_cell_color(i)
+            assert text_colors[i, j] == get_text_color(i, j, value, df.columns.tolist(), ["占比涨幅"])
+
+
+def test_html_and_svg_do_not_import_matplotlib(tmp_path):
+    code = (
+        "import sys, pandas as pd, show_result\n"
+        "df = pd.DataFrame({'占比涨幅': [1.0, -1.0]})\n"
+        "show_result.table_html(df, ['占比涨幅'])\n"
+        f"show_result.create_styled_table(df, ['占比涨幅'], {str(tmp_path / 'table.svg')!r})\n"
+        f"show_result.create_styled_table(df, ['占比涨幅'], {str(tmp_path / 'table.html')!r})\n"
+        "assert 'matplotlib' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
@@ -0,0 +1,81 @@
+import datetime
+import struct
+import numpy as np
+from tdx_reader import (DAY_DTYPE, EXT_DAY_DTYPE, MINUTE_DTYPE, read_day, read_day_range, amount_matrix,
+                        board_amount, date2int, minute_date, decode_minute_date, read_minute_from)
+
+DAYS = [datetime.date(2025, 10, 1) + datetime.timedelta(days=i) for i in range(20)]
+
+
+def pack_day(day, amount):
+    return struct.pack("<IIIIIfII", date2int(day), 1234, 1250, 1200, 1240, amount, 5678, 0)
+
+
+def test_day_dtype_matches_struct_layout(tmp_path):
+    path = tmp_path / "sh600000.day"
+    # 末尾不完整的记录忽略
+    path.write_bytes(pack_day(DAYS[0], 1.5e8) + pack_day(DAYS[1], 2.5e8) + b"\x00" * 7)
+    records = read_day(str(path))
+    assert DAY_DTYPE.itemsize == struct.calcsize("<IIIIIfII")
+    assert records["date"].tolist() == [20251001, 20251002]
+    assert records["open"].tolist() == [1234, 1234]
+    assert records["close"].tolist() == [1240, 1240]
+    assert records["amount"].tolist() == [1.5e8, 2.5e8]
+    assert records["volume"].tolist() == [5678, 5678]
+
+
+def test_read_day_range_and_amount_matrix(tmp_path):
+    path = tmp_path / "sz000001.day"
+    days = DAYS[::2]
+    path.write_bytes(b"".join(pack_day(day, 1000.0 * (i + 1)) for i, day in enumerate(days)))
+    records = read_day_range(str(path), 20251004, 20251011)
+    assert records["date"].tolist() == [20251005, 20251007, 20251009, 20251011]
+    assert len(read_day_range(str(path), 20251101, 20251130)) == 0
+    missing = str(tmp_path / "sz000002.day")
+    open(missing, "wb").close()
+    matrix = amount_matrix([str(path), missing], DAYS[3:7])
+    np.testing.assert_array_equal(matrix, [[np.nan, 3000.0, np.nan, 4000.0], [np.nan] * 4])
+
+
+def test_ext_day_dtype_and_board_amount(tmp_path):
+    # 扩展市场日线的价格及成交额均为浮点数
+    ext = tmp_path / "vipdoc" / "ds" / "lday"
+    ext.mkdir(parents=True)
+    (ext / "62#000300.day").write_bytes(b"".join(
+        struct.pack("<IfffffIf", date2int(day), 4500.5, 4510.0, 4490.0, 4505.25, 3.5e11 + i, 1000, 0.0)
+        for i, day in enumerate(DAYS[:3])))
+    records = read_day(str(ext / "62#000300.day"), EXT_DAY_DTYPE)
+    assert EXT_DAY_DTYPE.itemsize == struct.calcsize("<IfffffIf")
+    assert records["close"].tolist() == [4505.25] * 3
+    std = tmp_path / "vipdoc" / "sh" / "lday"
+    std.mkdir(parents=True)
+    (std / "sh880823.day").write_bytes(pack_day(DAYS[1], 2.0e10))
+    amount = board_amount(str(tmp_path), ["880823", "62#000300", "880878"], DAYS[:3])
+    want = np.array([[np.nan, 3.5e11, np.nan], [2.0e10, 3.5e11 + 1, np.nan], [np.nan, 3.5e11 + 2, np.nan]])
+    np.testing.assert_array_equal(amount, want.astype(np.float32))
+
+
+def pack_minute(day, minute, amount):
+    return struct.pack("<HHfffffII", minute_date(day), minute, 10.0, 10.5, 9.5, 10.2, amount, 300, 0)
+
+
+def test_minute_dtype_and_incremental_read(tmp_path):
+    assert MINUTE_DTYPE.itemsize == struct.calcsize("<HHfffffII")
+    assert minute_date(datetime.date(2025, 10, 13)) == 21 * 2048 + 1013
+    assert decode_minute_date(np.array([minute_date(d) for d in DAYS[:2]], dtype=np.uint16)).tolist() == [
+        20251001, 20251002]
+    path = tmp_path / "sh600000.lc1"
+    path.write_bytes(pack_minute(DAYS[0], 900, 1.0) + pack_minute(DAYS[1], 571, 2.0) + pack_minute(DAYS[1], 572, 3.0))
+    # 首次读取从当天第一条记录开始
+    records, offset = read_minute_from(str(path), -1, DAYS[1])
+    assert records["minute"].tolist() == [571, 572]
+    assert records["amount"].tolist() == [2.0, 3.0]
+    assert offset == 3 * MINUTE_DTYPE.itemsize
+    # 之后只读取新追加的完整记录
+    with open(path, "ab") as f:
+        f.write(pack_minute(DAYS[1], 573, 4.0) + pack_minute(DAYS[1], 574, 5.0)[:10])
+    records, offset = read_minute_from(str(path), offset, DAYS[1])
+    assert records["amount"].tolist() == [4.0]
+    assert offset == 4 * MINUTE_DTYPE.itemsize
+    records, _ = read_minute_from(str(tmp_path / "missing.lc1"), -1, DAYS[1])
+    assert len(records) == 0
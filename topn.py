@@ -0,0 +1,56 @@
+"""
+流式统计每日成交额的前N名,只保留每个日期的候选集合而不保存完整的日期×股票矩阵
+"""
+import numpy as np
+from typing import Sequence, Tuple
+
+
+class TopNAggregator:
+    """按日期统计前N名的聚合器,内存占用为O(日期数×N)
+
+    Args:
+        dates_count (int): 日期数量
+        sizes (Sequence[int]): 需要统计的前N名,例如(10, 20, 50, 100),一次扫描同时得到
+    """
+
+    def __init__(self, dates_count: int, sizes: Sequence[int] = (20,)):
+        self.sizes = tuple(sorted(set(sizes)))
+        self.capacity = self.sizes[-1]
+        self.values = np.full((0, dates_count), -np.inf)
+        self.index = np.full((0, dates_count), -1, dtype=np.int64)
+
+    def add(self, index: np.ndarray, chunk: np.ndarray):
+        """加入一批股票的成交额,index为chunk每行对应的股票序号,缺失值为nan"""
+        values = np.where(np.isnan(chunk), -np.inf, chunk)
+        index = np.broadcast_to(np.asarray(index, dtype=np.int64)[:, None], chunk.shape)
+        values = np.concatenate([self.values, values])
+        index = np.concatenate([self.index, index])
+        if len(values) > self.capacity:
+            keep = np.argpartition(-values, self.capacity - 1, axis=0)[:self.capacity]
+            values = np.take_along_axis(values, keep, axis=0)
+            index = np.take_along_axis(index, keep, axis=0)
+        self.values, self.index = values, index
+
+    def result(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """获取每个日期的前n名,按成交额降序排列
+
+        Returns:
+            (股票序号矩阵, 成交额矩阵),形状均为(n, 日期数),数量不足n时序号为-1,成交额为nan
+        """
+        if n not in self.sizes:
+            raise ValueError(f"未统计前{n}名,可选值为{self.sizes}")
+        order = np.argsort(-self.values, axis=0, kind="stable")[:n]
+        values = np.take_along_axis(self.values, order, axis=0)
+        index = np.take_along_axis(self.index, order, axis=0)
+        missing = np.isneginf(values)
+        values[missing] = np.nan
+        index[missing] = -1
+        if len(values) < n:
+            pad = n - len(values)
+            values = np.concatenate([values, np.full((pad, values.shape[1]), np.nan)])
+            index = np.concatenate([index, np.full((pad, index.shape[1]), -1, dtype=np.int64)])
+        return index, values
+
+    def sums(self, n: int) -> np.ndarray:
+        """获取每个日期前n名的成交额合计,没有数据的日期为0"""
+        return np.nansum(self.result(n)[1], axis=0)
@@ -0,0 +1,94 @@
+"""
+A股股票池的索引,记录每只股票的板块、日线文件路径、大小、修改时间及最后交易日期
+"""
+import os
+import pandas as pd
+from typing import Callable, List
+from tdx_reader import lday_folder, last_date
+
+# 各板块在通达信中的市场目录及代码前缀
+BOARDS = {
+    "沪市主板": ("sh", ("600", "601", "603", "605")),
+    "科创板": ("sh", ("688", "689")),
+    "深市主板": ("sz", ("000", "001", "002", "003", "004")),
+    "创业板": ("sz", ("300", "301", "302")),
+    "北交所": ("bj", ("43", "83", "87", "92")),
+}
+SHSZ_BOARDS = ("沪市主板", "科创板", "深市主板", "创业板")  # 沪深两市的A股板块
+COLUMNS = ["symbol", "market", "board", "path", "size", "mtime", "last_date"]
+
+
+def classify(market, code):
+    """判断股票所属的板块,不属于A股板块时返回None
+
+    Args:
+        market (str): 市场目录,sh、sz或bj
+        code (str): 6位股票代码
+    """
+    for board, (board_market, prefixes) in BOARDS.items():
+        if market == board_market and code.startswith(prefixes):
+            return board
+    return None
+
+
+def load_index(path) -> pd.DataFrame:
+    """读取股票池索引文件,不存在时返回空表"""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.read_csv(path, dtype={"symbol": str, "market": str, "board": str, "path": str})
+
+
+def build_index(tdx_path, path) -> pd.DataFrame:
+    """增量更新股票池索引并保存到path
+
+    只有大小或修改时间发生变化的日线文件才会重新读取最后交易日期,已删除的文件从索引中移除
+    """
+    old = load_index(path).set_index("path")
+    rows = []
+    for market in sorted({market for market, _ in BOARDS.values()}):
+        folder = lday_folder(tdx_path, market)
+        if not os.path.isdir(folder):
+            continue
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(".day") or len(name) != 12:
+                    continue
+                board = classify(market, name[2:8])
+                if board is None:
+                    continue
+                stat = entry.stat()
+                if entry.path in old.index and old.at[entry.path, "size"] == stat.st_size \
+                        and old.at[entry.path, "mtime"] == stat.st_mtime_ns:
+                    date = old.at[entry.path, "last_date"]
+                else:
+                    date = last_date(entry.path)
+                rows.append([name[2:8], market, board, entry.path, stat.st_size, stat.st_mtime_ns, date])
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df = df.sort_values(["market", "symbol"], ignore_index=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, index=False)
+    return df
+
+
+def board_filter(*boards) -> Callable[[pd.DataFrame], pd.Series]:
+    """按板块筛选"""
+    return lambda df: df["board"].isin(boards)
+
+
+def prefix_filter(*prefixes) -> Callable[[pd.DataFrame], pd.Series]:
+    """按代码前缀筛选"""
+    return lambda df: df["symbol"].str.startswith(prefixes)
+
+
+def active_filter(date: int) -> Callable[[pd.DataFrame], pd.Series]:
+    """筛选最后交易日期不早于date的股票,date为整数日期,例如20251013"""
+    return lambda df: df["last_date"] >= date
+
+
+def select(df: pd.DataFrame, filters: List[Callable[[pd.DataFrame], pd.Series]]) -> pd.DataFrame:
+    """筛选同时满足所有条件的股票"""
+    mask = pd.Series(True, index=df.index)
+    for func in filters:
+        mask &= func(df)
+    return df[mask].reset_index(drop=True)
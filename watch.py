@@ -0,0 +1,139 @@
+"""
+常驻模式,轮询通达信日线文件的修改时间,只重新读取被修改的股票,并在本地通过HTTP提供最新的报表
+
+    GET /             网页表格
+    GET /report.json  表格数据,nan为null
+"""
+import json
+import time
+import datetime
+import threading
+import traceback
+import pandas as pd
+import data_api
+from typing import Dict, List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tdx_reader import changed_files, lday_snapshot
+
+MARKETS = ("sh", "sz", "ds")  # 需要监控的日线文件夹
+
+
+def snapshot(tdx_path) -> Dict[str, tuple]:
+    """获取所有需要监控的日线文件的(大小, 修改时间)"""
+    return lday_snapshot(tdx_path, MARKETS)
+
+
+class ReportState:
+    """最新一次计算的报表,供HTTP请求读取"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.table: pd.DataFrame = None
+        self.updated = None
+        self.error = None
+
+    def set(self, table: pd.DataFrame):
+        with self.lock:
+            self.table, self.updated, self.error = table, datetime.datetime.now(), None
+
+    def fail(self, error: str):
+        with self.lock:
+            self.error = error
+
+    def to_json(self) -> dict:
+        with self.lock:
+            table, updated, error = self.table, self.updated, self.error
+        rd = {"updated": None if updated is None else updated.isoformat(timespec="seconds"), "error": error,
+              "columns": [], "data": []}
+        if table is not None:
+            rd["columns"] = table.columns.tolist()
+            values = table.astype(object).where(table.notna(), None)
+            rd["data"] = [[str(row[0])] + row[1:] for row in values.values.tolist()]
+        return rd
+
+    def to_html(self) -> str:
+        from show_result import table_html
+        with self.lock:
+            table, updated = self.table, self.updated
+        if table is None:
+            return "<html><body>报表尚未生成</body></html>"
+        title = f"市场情况分析图表({updated:%Y-%m-%d %H:%M:%S}更新)"
+        return table_html(table, [name for name in table.columns if "涨幅" in name], title)
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    state: ReportState = None
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path in ("/", "/report.html"):
+            body, content_type = self.state.to_html().encode("utf-8"), "text/html; charset=utf-8"
+        elif path == "/report.json":
+            body = json.dumps(self.state.to_json(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(state: ReportState, host, port) -> ThreadingHTTPServer:
+    """在后台线程中启动HTTP服务"""
+    handler = type("Handler", (ReportHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def refresh(state: ReportState, changed: List[str]) -> bool:
+    """重新读取被修改的日线文件并重新计算报表,出错时保留上一次的报表并返回False"""
+    try:
+        if len(changed) > 0:
+            count = data_api.refresh_matrix(changed, data_api.get_trade_date())
+            print(f"{len(changed)}个日线文件被修改,重新读取{count}只股票")
+        results = data_api.main()
+        state.set(results["生成图表"])
+        return True
+    except Exception:
+        state.fail(traceback.format_exc())
+        traceback.print_exc()
+        return False
+
+
+def watch(interval=60, host="127.0.0.1", port=8050):
+    """常驻运行,每interval秒检查一次日线文件,有文件被修改或交易日历前进时重新计算报表
+
+    Args:
+        interval (float): 轮询间隔(秒)
+        host (str): HTTP服务监听的地址
+        port (int): HTTP服务监听的端口
+    """
+    state = ReportState()
+    server = serve(state, host, port)
+    print(f"报表地址:http://{host}:{port}/ 及 http://{host}:{port}/report.json")
+    files = snapshot(data_api.tdx_path)
+    dates = data_api.get_trade_date()
+    refresh(state, [])
+    # 首次计算已重新读取最新日期,之后只重新读取被修改的文件
+    data_api.matrix_refresh_latest = False
+    pending: List[str] = []  # 已被修改但尚未成功重新计算的日线文件,出错后的重试中继续重新读取
+    try:
+        while True:
+            time.sleep(interval)
+            new_files = snapshot(data_api.tdx_path)
+            pending = list(dict.fromkeys(pending + changed_files(files, new_files)))
+            files = new_files
+            new_dates = data_api.get_trade_date()
+            if len(pending) > 0 or new_dates != dates or state.error is not None:
+                dates = new_dates
+                if refresh(state, pending):
+                    pending = []
+    finally:
+        server.shutdown()